@@ -0,0 +1,109 @@
+// Faceted plugin filter of the landing page. The precomputed index
+// (plugin-facets.json, written by collect_plugins.py) is only fetched once the
+// reader interacts with the filter.
+(function () {
+  "use strict";
+
+  const form = document.getElementById("plugin-filter");
+  if (!form) {
+    return;
+  }
+  const results = document.getElementById("plugin-filter-results");
+  const selects = {
+    type: form.querySelector("[name=type]"),
+    scheme: form.querySelector("[name=scheme]"),
+    snakemake: form.querySelector("[name=snakemake]"),
+    updated: form.querySelector("[name=updated]"),
+  };
+  const settingInput = form.querySelector("[name=setting]");
+  let index = null;
+  let loading = null;
+
+  function load() {
+    if (!loading) {
+      loading = fetch(form.dataset.index)
+        .then((response) => response.json())
+        .then((data) => {
+          index = data;
+          for (const [facet, select] of Object.entries(selects)) {
+            for (const value of Object.keys(index.facets[facet])) {
+              select.add(new Option(value, value));
+            }
+          }
+        });
+    }
+    return loading;
+  }
+
+  function intersect(a, b) {
+    // both lists are sorted plugin positions
+    const out = [];
+    let i = 0;
+    let j = 0;
+    while (i < a.length && j < b.length) {
+      if (a[i] === b[j]) {
+        out.push(a[i]);
+        i++;
+        j++;
+      } else if (a[i] < b[j]) {
+        i++;
+      } else {
+        j++;
+      }
+    }
+    return out;
+  }
+
+  function settingMatches(prefix) {
+    const matches = new Set();
+    for (const [setting, positions] of Object.entries(index.facets.setting)) {
+      if (setting.startsWith(prefix)) {
+        positions.forEach((i) => matches.add(i));
+      }
+    }
+    return Array.from(matches).sort((a, b) => a - b);
+  }
+
+  function update() {
+    let selected = null;
+    for (const [facet, select] of Object.entries(selects)) {
+      if (select.value) {
+        const positions = index.facets[facet][select.value] || [];
+        selected = selected === null ? positions : intersect(selected, positions);
+      }
+    }
+    const setting = settingInput.value.trim().toLowerCase();
+    if (setting) {
+      const positions = settingMatches(setting);
+      selected = selected === null ? positions : intersect(selected, positions);
+    }
+
+    results.replaceChildren();
+    if (selected === null) {
+      return;
+    }
+    if (selected.length === 0) {
+      results.textContent = "No matching plugins.";
+      return;
+    }
+    const list = document.createElement("ul");
+    for (const i of selected) {
+      const [name, type, summary] = index.plugins[i];
+      const item = document.createElement("li");
+      const link = document.createElement("a");
+      link.href = `${form.dataset.root}plugins/${type}/${name}.html`;
+      link.textContent = `${name} (${type})`;
+      item.append(link);
+      if (summary) {
+        item.append(`: ${summary}`);
+      }
+      list.append(item);
+    }
+    results.append(list);
+  }
+
+  form.addEventListener("focusin", load, { once: true });
+  form.addEventListener("pointerenter", load, { once: true });
+  form.addEventListener("input", () => load().then(update));
+  form.addEventListener("submit", (event) => event.preventDefault());
+})();
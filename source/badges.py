@@ -0,0 +1,68 @@
+"""
+Static badges in the flat style of shields.io, rendered at build time from the
+collected plugin data and embedded into the plugin pages as inline SVG.
+"""
+
+from dataclasses import dataclass
+from html import escape
+from typing import Optional
+from urllib.parse import unquote
+
+# approximate advance widths of Verdana at 11px, which shields.io uses
+_CHAR_WIDTHS = {
+    **dict.fromkeys(" ", 3.9),
+    **dict.fromkeys("ijl.,:;'|!", 3.1),
+    **dict.fromkeys("frtI()[]/-", 4.6),
+    **dict.fromkeys("sz", 5.7),
+    **dict.fromkeys("mMW%", 10.5),
+    **dict.fromkeys("wOQGDHNUC@", 8.5),
+}
+_DEFAULT_CHAR_WIDTH = 6.9
+_PADDING = 6
+_HEIGHT = 20
+_LABEL_COLOR = "#555"
+
+
+def _text_width(text: str) -> int:
+    return round(sum(_CHAR_WIDTHS.get(char, _DEFAULT_CHAR_WIDTH) for char in text))
+
+
+@dataclass
+class Badge:
+    label: str
+    message: str
+    # hex color, optionally URL encoded as for shields.io (e.g. %2316a34a)
+    color: str
+    target: Optional[str] = None
+
+    def svg(self) -> str:
+        """
+        Render the badge as SVG. No ids are used, such that many badges can be
+        inlined into the same page.
+        """
+        color = unquote(self.color)
+        label_width = _text_width(self.label) + 2 * _PADDING
+        message_width = _text_width(self.message) + 2 * _PADDING
+        width = label_width + message_width
+        title = escape(f"{self.label}: {self.message}")
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+            f'height="{_HEIGHT}" role="img" aria-label="{title}">'
+            f"<title>{title}</title>"
+            f'<rect width="{width}" height="{_HEIGHT}" rx="3" fill="{escape(color)}"/>'
+            f'<rect width="{label_width}" height="{_HEIGHT}" rx="3" '
+            f'fill="{_LABEL_COLOR}"/>'
+            f'<rect x="{label_width - 3}" width="3" height="{_HEIGHT}" '
+            f'fill="{_LABEL_COLOR}"/>'
+            '<g fill="#fff" text-anchor="middle" '
+            'font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="11">'
+            f'<text x="{label_width / 2}" y="14">{escape(self.label)}</text>'
+            f'<text x="{label_width + message_width / 2}" y="14">'
+            f"{escape(self.message)}</text></g></svg>"
+        )
+
+    def html(self) -> str:
+        """Render the badge as inline SVG, linked to its target (if any)."""
+        if self.target is None:
+            return self.svg()
+        return f'<a href="{escape(self.target)}">{self.svg()}</a>'
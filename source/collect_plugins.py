@@ -1,56 +1,500 @@
 from abc import ABC, abstractmethod
-from collections import defaultdict
-from dataclasses import dataclass
+import argparse
+import codecs
+from collections import Counter, defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field, fields, replace
 from datetime import datetime, timezone
-import git
-import git.exc
+import hashlib
 import json
+import multiprocessing
 import os
+import random
 import re
 from pathlib import Path
 import shutil
+import signal
 import subprocess
 import sys
 import tempfile
 import textwrap
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar
 import uuid
-from packaging.specifiers import SpecifierSet
 from packaging.version import Version
-from pypi_simple import PyPISimple
-
-import requests
 from ratelimit import limits, sleep_and_retry
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-import m2r2
 
+from badges import Badge
 
-TEST_PACKAGES = (
-    [
-        package.strip()
-        for package in os.environ.get("TEST_PACKAGES").split(",")
-        if package.strip()
-    ]
-    if "TEST_PACKAGES" in os.environ
-    else None
-)
+# Heavy dependencies are imported where needed, such that the commands of the
+# CLI (see main) and the Sphinx extension only load what they use.
+if TYPE_CHECKING:
+    from jinja2 import Environment
+    from packaging.specifiers import SpecifierSet
+
+
+@dataclass
+class Deadlines:
+    """
+    Timeouts (in seconds) for the stages of collecting a single plugin, the overall
+    per-plugin budget, the retry policy for idempotent PyPI requests (and git
+    clones, which are not hedged), and the budget for refreshing plugins in a run.
+    Each field can be overridden via an environment variable
+    `CATALOG_DEADLINE_<FIELD>`, e.g. `CATALOG_DEADLINE_PLUGIN=600`.
+    """
+
+    pypi: float = 60
+    git: float = 180
+    install: float = 900
+    extract: float = 120
+    plugin: float = 2400
+    retries: int = 3
+    backoff: float = 1.0
+    hedge_after: float = 5.0
+    # wall-clock budget of a whole run, after which the remaining plugins are
+    # rendered from their last stored result (unlimited if unset)
+    refresh: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "Deadlines":
+        overrides = {}
+        for deadline in fields(cls):
+            value = os.environ.get(f"CATALOG_DEADLINE_{deadline.name.upper()}")
+            if value is not None:
+                overrides[deadline.name] = (
+                    int(value) if deadline.type is int else float(value)
+                )
+        return cls(**overrides)
+
+
+@dataclass
+class RunOptions:
+    """
+    Options of a collection run (see collect_plugins and collect_shard). Unless
+    given on the command line, they are read from the environment variables
+    `CATALOG_DEADLINE_<FIELD>` (see Deadlines), `CATALOG_STATE_DIR`,
+    `CATALOG_REMOTE_BADGES` and `CATALOG_GROUPED_ENVS` when the run starts.
+    """
+
+    deadlines: Deadlines = field(default_factory=Deadlines)
+    # results of previous runs, relative to the source directory
+    state_dir: Path = Path("../.catalog-state")
+    # badges are rendered at build time, unless remote shields.io badges are requested
+    remote_badges: bool = False
+    # install compatible plugins into shared environments (see _collect_group_metadata)
+    grouped_envs: bool = False
+
+    @classmethod
+    def from_env(cls) -> "RunOptions":
+        return cls(
+            deadlines=Deadlines.from_env(),
+            state_dir=Path(os.environ.get("CATALOG_STATE_DIR", cls.state_dir)),
+            remote_badges=bool(os.environ.get("CATALOG_REMOTE_BADGES")),
+            grouped_envs=bool(os.environ.get("CATALOG_GROUPED_ENVS")),
+        )
+
+
+# deadlines of the current run (see _run_deadlines)
+DEADLINES = Deadlines()
+
+
+@contextmanager
+def _run_deadlines(deadlines: Deadlines):
+    """Apply `deadlines` to all stages collected within the context."""
+    global DEADLINES
+    previous, DEADLINES = DEADLINES, deadlines
+    try:
+        yield
+    finally:
+        DEADLINES = previous
+
+
+class Budget:
+    """Wall-clock budget shared by all stages of collecting a single plugin."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def timeout(self, stage_timeout: float) -> float:
+        """
+        Return the timeout for the next stage, i.e. the stage's own timeout capped
+        by the remaining budget. Raises DeadlineExceeded if the budget is used up.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Plugin budget of {self.seconds:.0f}s exceeded.")
+        return min(stage_timeout, remaining)
+
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Threads for hedged requests. A straggling request is left to run into its own
+# socket timeout while the caller continues with the faster one.
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+def _hedged(fetch, hedge_after: float, timeout: float):
+    """
+    Run `fetch` and, if it did not finish after `hedge_after` seconds, start a
+    second identical attempt. The first successful result wins. Raises
+    DeadlineExceeded if neither attempt finishes within `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    pending = {_HEDGE_POOL.submit(fetch)}
+    hedged = False
+    error = None
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        wait_time = remaining if hedged else min(hedge_after, remaining)
+        done, pending = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except MetadataError as e:
+                error = e
+        if not hedged and not done:
+            pending.add(_HEDGE_POOL.submit(fetch))
+            hedged = True
+    if error is not None and not pending:
+        raise error
+    raise DeadlineExceeded(f"No response within {timeout:.0f}s.")
+
+
+class SingleFlight:
+    """
+    Deduplicate remote fetches: calls with the same key that overlap share a
+    single fetch, and successful results are kept for the lifetime of the
+    instance (a collection run, see fetch_scope). A failure is only passed to the
+    calls waiting for it, later calls fetch again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fetches: Dict[Any, Future] = {}
+
+    def do(self, key, fetch, timeout: Optional[float] = None):
+        """
+        Return the result of `fetch()` for `key`, waiting at most `timeout`
+        seconds for an ongoing fetch of another caller.
+        """
+        with self._lock:
+            future = self._fetches.get(key)
+            leader = future is None
+            if leader:
+                future = self._fetches[key] = Future()
+        if not leader:
+            try:
+                return future.result(timeout=timeout)
+            except TimeoutError:
+                raise DeadlineExceeded(
+                    f"No result of the ongoing fetch of {key} within {timeout:.0f}s."
+                )
+        try:
+            result = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._fetches[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+
+# Fetches of the current collection run, see fetch_scope.
+_FETCHES: Optional[SingleFlight] = None
+
+
+@contextmanager
+def fetch_scope():
+    """
+    Deduplicate PyPI and git fetches within the block (or decorated function),
+    such that each resource is fetched at most once per collection run.
+    """
+    global _FETCHES
+    previous, _FETCHES = _FETCHES, SingleFlight()
+    try:
+        yield _FETCHES
+    finally:
+        _FETCHES = previous
+
+
+def _single_flight(key, fetch, timeout: Optional[float] = None):
+    if _FETCHES is None:
+        return fetch()
+    return _FETCHES.do(key, fetch, timeout)
+
+
+@contextmanager
+def _timed(stages: Optional[Dict[str, float]], stage: str):
+    """Add the time spent in the block to `stages[stage]` (if given)."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + time.monotonic() - started
 
 
 @sleep_and_retry
 @limits(calls=20, period=1)
-def pypi_api(query, accept="application/json"):
-    res = requests.get(
-        query,
-        headers={
-            "Accept": accept,
-            "User-Agent": "Snakemake plugin catalog (https://github.com/snakemake/snakemake-plugin-catalog)",
-        },
-    )
-    if res.status_code != 200:
-        raise MetadataError(f"API request {query} failed with status {res.status_code}")
+def _pypi_request(query, accept, timeout, parse):
+    import requests
+
+    try:
+        res = requests.get(
+            query,
+            headers={
+                "Accept": accept,
+                "User-Agent": "Snakemake plugin catalog (https://github.com/snakemake/snakemake-plugin-catalog)",
+            },
+            timeout=timeout,
+            stream=True,
+        )
+        with res:
+            if res.status_code in _RETRY_STATUS:
+                raise TransientError(
+                    f"API request {query} failed with status {res.status_code}"
+                )
+            if res.status_code != 200:
+                raise MetadataError(
+                    f"API request {query} failed with status {res.status_code}"
+                )
+            return parse(res)
+    except requests.RequestException as e:
+        raise TransientError(f"API request {query} failed: {e}") from e
+
+
+def _parse_json(res):
     return res.json()
 
 
+def pypi_api(query, accept="application/json", timeout=None, parse=None):
+    """
+    Query the PyPI API. Transient failures are retried with exponential backoff
+    and slow requests are hedged, all within `timeout` seconds in total.
+    The response is passed to `parse` (by default decoding the whole JSON body).
+    Within a fetch_scope, each query is only sent once.
+    """
+    parse = parse or _parse_json
+    timeout = DEADLINES.pypi if timeout is None else timeout
+    return _single_flight(
+        ("pypi", query, accept, parse),
+        lambda: _pypi_api(query, accept, timeout, parse),
+        timeout,
+    )
+
+
+def _pypi_api(query, accept, timeout, parse):
+    return _retrying(
+        lambda remaining: _hedged(
+            lambda: _pypi_request(query, accept, remaining, parse),
+            DEADLINES.hedge_after,
+            remaining,
+        ),
+        timeout,
+        f"API request {query}",
+    )
+
+
+_T = TypeVar("_T")
+
+
+def _retrying(call: Callable[[float], _T], timeout: float, what: str) -> _T:
+    """
+    Run `call` with the time remaining of `timeout`, retrying it with jittered
+    exponential backoff on TransientError (see DEADLINES.retries and
+    DEADLINES.backoff). Raises DeadlineExceeded if `what` did not succeed in time.
+    """
+    deadline = time.monotonic() + timeout
+    error = None
+    for attempt in range(DEADLINES.retries + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            return call(remaining)
+        except TransientError as e:
+            error = e
+            if attempt < DEADLINES.retries:
+                delay = DEADLINES.backoff * 2**attempt * random.uniform(0.5, 1.5)
+                time.sleep(max(0, min(delay, deadline - time.monotonic())))
+    if error is not None and time.monotonic() < deadline:
+        raise error
+    raise DeadlineExceeded(f"{what} did not succeed within {timeout:.0f}s: {error}")
+
+
+class _PypiInfoParser:
+    """
+    Incremental parser for /pypi/<package>/json responses that only decodes the
+    "info" object. Other top-level values (in particular "releases" and "urls",
+    which grow with every release) are skipped without being decoded, and since
+    PyPI sends "info" first, parsing usually stops before they are received.
+    """
+
+    _TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*(")?|[{}\[\]]')
+    _SEPARATOR_RE = re.compile(r"[\s,]*")
+    _WHITESPACE_RE = re.compile(r"\s*")
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        self._depth = 0
+
+    def feed(self, chunk: bytes, final: bool = False) -> Optional[Dict[str, Any]]:
+        """Feed the next chunk, returning the info object once it is complete."""
+        self._buf += self._utf8.decode(chunk, final)
+        if self._pos > 1 << 16:
+            # drop what has been consumed already
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        while True:
+            complete, info = self._step(final)
+            if info is not None:
+                return info
+            if not complete:
+                if final:
+                    raise MetadataError("Incomplete or invalid PyPI response.")
+                return None
+
+    def _step(self, final: bool):
+        """
+        Advance by one token. Returns whether the step could be completed with the
+        data received so far, and the info object once it has been decoded.
+        """
+        buf = self._buf
+        if self._state == "skip":
+            for token in self._TOKEN_RE.finditer(buf, self._pos):
+                text = token.group(0)
+                if text[0] == '"':
+                    if token.group(1) is None:
+                        # string continues in the next chunk
+                        self._pos = token.start()
+                        return False, None
+                elif text in "{[":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._pos = token.end()
+                        self._state = "key"
+                        return True, None
+            self._pos = len(buf)
+            return False, None
+
+        separator = self._SEPARATOR_RE if self._state == "key" else self._WHITESPACE_RE
+        pos = separator.match(buf, self._pos).end()
+        if pos == len(buf):
+            return False, None
+
+        if self._state == "start":
+            if buf[pos] != "{":
+                raise MetadataError("Invalid PyPI response.")
+            self._pos = pos + 1
+            self._state = "key"
+        elif self._state == "key":
+            if buf[pos] != '"':
+                raise MetadataError("PyPI response does not contain package info.")
+            try:
+                key, pos = json.decoder.scanstring(buf, pos + 1)
+            except json.JSONDecodeError:
+                return False, None
+            pos = self._WHITESPACE_RE.match(buf, pos).end()
+            if pos == len(buf):
+                return False, None
+            self._key = key
+            self._pos = pos + 1  # skip the colon
+            self._state = "value"
+        elif self._state == "value":
+            if self._key != "info" and buf[pos] in "{[":
+                self._pos = pos
+                self._depth = 0
+                self._state = "skip"
+                return True, None
+            try:
+                value, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                return False, None
+            if self._key == "info":
+                return True, value
+            if end == len(buf) and not final:
+                # a number might continue in the next chunk
+                return False, None
+            self._pos = end
+            self._state = "key"
+        return True, None
+
+
+def _parse_pypi_info(res) -> Dict[str, Any]:
+    """Read the info object of a streamed PyPI JSON response."""
+    parser = _PypiInfoParser()
+    for chunk in res.iter_content(chunk_size=1 << 16):
+        info = parser.feed(chunk)
+        if info is not None:
+            return info
+    return parser.feed(b"", final=True)
+
+
+@dataclass(slots=True)
+class PluginRecord:
+    """The part of the PyPI metadata of a plugin package used by the catalog."""
+
+    name: str
+    version: str
+    summary: Optional[str]
+    description: str
+    authors: List[str]
+    project_urls: Dict[str, str]
+    requires_dist: List[str]
+    license: Optional[str]
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> "PluginRecord":
+        author_info = info.get("author") or info.get("author_email")
+        return cls(
+            name=info["name"],
+            version=info["version"],
+            summary=info.get("summary"),
+            description=info.get("description") or "",
+            authors=(
+                [author.strip() for author in author_info.split(",")]
+                if author_info
+                else []
+            ),
+            project_urls=info.get("project_urls") or {},
+            requires_dist=info.get("requires_dist") or [],
+            license=info.get("license_expression") or info.get("license"),
+        )
+
+
+def pypi_plugin_record(package: str, timeout=None) -> PluginRecord:
+    """Fetch the compact PyPI record of the latest release of `package`."""
+    return PluginRecord.from_info(
+        pypi_api(
+            f"https://pypi.org/pypi/{package}/json",
+            timeout=timeout,
+            parse=_parse_pypi_info,
+        )
+    )
+
+
 class MetadataError(Exception):
     def log(self, package: str) -> None:
         print(
@@ -59,17 +503,77 @@ class MetadataError(Exception):
         )
 
 
+class TransientError(MetadataError):
+    """A failure that is worth retrying, e.g. a connection reset or HTTP 503."""
+
+
+class DeadlineExceeded(MetadataError):
+    """A stage or the overall per-plugin budget ran out of time."""
+
+
+def _run_process(
+    cmd: List[str],
+    cwd=None,
+    timeout: Optional[float] = None,
+    stdout=subprocess.PIPE,
+    stderr=subprocess.STDOUT,
+    env=None,
+) -> subprocess.CompletedProcess:
+    """
+    Run `cmd` like `subprocess.run(..., check=True)`, but on timeout kill the
+    whole process group (pixi and git spawn children that would otherwise keep
+    the pipes open) and raise DeadlineExceeded.
+    """
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=stdout,
+        stderr=stderr,
+        env=env,
+        start_new_session=True,
+    ) as proc:
+        try:
+            out, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.communicate()
+            raise DeadlineExceeded(
+                f"Command '{' '.join(cmd)}' did not finish within {timeout:.0f}s."
+            )
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, out, err)
+    return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
+
+
+_SETTINGS_STATEMENT = (
+    "import json; "
+    "fmt_type = lambda thetype: thetype.__name__ if thetype is not None else None; "
+    "fmt_setting_item = lambda key, value: (key, fmt_type(value)) if key == 'type' else (key, value); "
+    "fmt_setting = lambda setting: dict(map(lambda item: fmt_setting_item(*item), setting.items())); "
+    "print(json.dumps(list(map(fmt_setting, plugin.get_settings_info()))))"
+)
+
+
 class MetadataCollector:
     """
     Collect metadata on a plugin `package` of a specific `plugin_type` by installing it
     in a temporary working directory specific to each class instance.
     """
 
-    def __init__(self, package: str, plugin_type: str, version: str):
+    def __init__(
+        self,
+        package: str,
+        plugin_type: str,
+        version: str,
+        budget: Optional[Budget] = None,
+    ):
         self.envname = uuid.uuid4().hex
         self.package = package
         self.version = version
+        # packages installed into the workspace (package -> version)
+        self.packages = {package: version}
         self.plugin_type = plugin_type
+        self.budget = budget or Budget(DEADLINES.plugin)
         self.tempdir = None
 
     @property
@@ -81,20 +585,37 @@ class MetadataCollector:
         return f"{self.plugin_type.title()}PluginRegistry"
 
     def _run(
-        self, cmd: List[str], stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        self,
+        cmd: List[str],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        timeout: Optional[float] = None,
     ) -> subprocess.CompletedProcess:
         assert self.tempdir is not None
-        return subprocess.run(
+        return _run_process(
             cmd,
             cwd=self.tempdir.name,
+            timeout=self.budget.timeout(
+                DEADLINES.install if timeout is None else timeout
+            ),
             stdout=stdout,
             stderr=stderr,
-            check=True,
         )
 
+    def _init_workspace(self):
+        self._run(["pixi", "init", "--channel", "conda-forge", "--channel", "bioconda"])
+
     def __enter__(self):
         self.tempdir = tempfile.TemporaryDirectory()
-        self._run(["pixi", "init", "--channel", "conda-forge", "--channel", "bioconda"])
+        try:
+            return self._setup()
+        except BaseException:
+            # __exit__ is not called if __enter__ fails
+            self.tempdir.cleanup()
+            raise
+
+    def _setup(self):
+        self._init_workspace()
         self._run(
             [
                 "pixi",
@@ -106,19 +627,26 @@ class MetadataCollector:
                 f"python -c \"from snakemake_interface_{self.plugin_type}_plugins.registry import {self.registry}; plugin = {self.registry}().get_plugin('{self.plugin_name}'); {{{{statement}}}}\"",
             ]
         )
-
-        def pixi_add(args=None):
-            """
-            Add the package for which metadata is to be parsed to the temporary
-            workspace.
-            """
-            args = args or []
-            self._run(["pixi", "add", f"{self.package}=={self.version}"] + args)
+        self._install()
+        return self
+
+    def _install(self):
+        """Add the packages for which metadata is to be parsed to the workspace."""
+
+        def pixi_add(args):
+            self._run(
+                ["pixi", "add"]
+                + [
+                    f"{package}=={version}"
+                    for package, version in self.packages.items()
+                ]
+                + args
+            )
 
         # try conda first
         try:
             pixi_add(["snakemake-minimal"])
-            return self
+            return
         except subprocess.CalledProcessError:
             pass
 
@@ -132,7 +660,7 @@ class MetadataCollector:
             try:
                 self._run(["pixi", "add", f"python={py_ver_constraint}"])
                 pixi_add(["snakemake", "--pypi"])
-                return self
+                return
             except subprocess.CalledProcessError as e:
                 if error is None:
                     error = e.stdout.decode()
@@ -147,21 +675,137 @@ class MetadataCollector:
     def extract_info(self, statement: str) -> str:
         try:
             res = self._run(
-                ["pixi", "run", "extract-info", statement], stderr=subprocess.PIPE
+                ["pixi", "run", "extract-info", statement],
+                stderr=subprocess.PIPE,
+                timeout=DEADLINES.extract,
             )
         except subprocess.CalledProcessError as e:
             raise MetadataError(f"Not a valid plugin: {e.stderr.decode()}") from e
         return res.stdout.decode()
 
     def get_settings(self) -> List[Dict[str, Any]]:
-        info = self.extract_info(
-            "import json; "
-            "fmt_type = lambda thetype: thetype.__name__ if thetype is not None else None; "
-            "fmt_setting_item = lambda key, value: (key, fmt_type(value)) if key == 'type' else (key, value); "
-            "fmt_setting = lambda setting: dict(map(lambda item: fmt_setting_item(*item), setting.items())); "
-            "print(json.dumps(list(map(fmt_setting, plugin.get_settings_info()))))"
+        return json.loads(self.extract_info(_SETTINGS_STATEMENT))
+
+
+# Extracts the metadata of several plugins in one interpreter. Plugins and
+# statements are read from extract-request.json, results are written to
+# extract-result.json.
+_GROUP_EXTRACT_SCRIPT = """
+import contextlib
+import importlib
+import io
+import json
+
+with open("extract-request.json") as f:
+    request = json.load(f)
+registry = getattr(importlib.import_module(request["module"]), request["registry"])
+results = {}
+for name in request["plugins"]:
+    try:
+        plugin = registry().get_plugin(name)
+        outputs = {}
+        for key, statement in request["statements"].items():
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                exec(statement, {"plugin": plugin})
+            outputs[key] = out.getvalue()
+        results[name] = {"outputs": outputs}
+    except Exception as e:
+        results[name] = {"error": f"{type(e).__name__}: {e}"}
+with open("extract-result.json", "w") as f:
+    json.dump(results, f)
+"""
+
+
+def _group_seconds(size: int) -> float:
+    """Return the default budget of a group of `size` plugins."""
+    # one installation, but an extraction per plugin
+    return DEADLINES.plugin + DEADLINES.extract * (size - 1)
+
+
+class GroupMetadataCollector(MetadataCollector):
+    """
+    Collect metadata on several plugin `packages` (package -> version) of the
+    same type, installed into a single environment with one solve. Like for
+    single plugins, PyPI is used if the packages cannot be installed from conda.
+    """
+
+    def __init__(
+        self,
+        packages: Dict[str, str],
+        plugin_type: str,
+        budget: Optional[Budget] = None,
+    ):
+        package, version = next(iter(packages.items()))
+        super().__init__(
+            package,
+            plugin_type,
+            version,
+            budget=budget or Budget(_group_seconds(len(packages))),
         )
-        return json.loads(info)
+        self.packages = packages
+
+    def _setup(self):
+        # the plugins are loaded by _GROUP_EXTRACT_SCRIPT, no task is needed
+        self._init_workspace()
+        self._install()
+        return self
+
+    def _extract(self, statements: Dict[str, str]) -> Dict[str, Any]:
+        assert self.tempdir is not None
+        workdir = Path(self.tempdir.name)
+        (workdir / "extract_info.py").write_text(_GROUP_EXTRACT_SCRIPT)
+        prefix = f"snakemake-{self.plugin_type}-plugin-"
+        with open(workdir / "extract-request.json", "w") as f:
+            json.dump(
+                {
+                    "module": f"snakemake_interface_{self.plugin_type}_plugins.registry",
+                    "registry": self.registry,
+                    "plugins": [
+                        package.removeprefix(prefix) for package in self.packages
+                    ],
+                    "statements": statements,
+                },
+                f,
+            )
+        try:
+            self._run(
+                ["pixi", "run", "python", "extract_info.py"],
+                stderr=subprocess.PIPE,
+                timeout=DEADLINES.extract * len(self.packages),
+            )
+        except subprocess.CalledProcessError as e:
+            raise MetadataError(f"Extraction failed: {e.stderr.decode()}") from e
+        with open(workdir / "extract-result.json") as f:
+            results = json.load(f)
+        return {
+            package: results[package.removeprefix(prefix)] for package in self.packages
+        }
+
+    def collect(self, aux_info_statement: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the settings and auxiliary info of each package, or the
+        MetadataError that occurred when extracting them.
+        """
+        statements = {"settings": _SETTINGS_STATEMENT}
+        if aux_info_statement is not None:
+            statements["aux_info"] = aux_info_statement
+        metadata = {}
+        for package, result in self._extract(statements).items():
+            if "error" in result:
+                metadata[package] = MetadataError(
+                    f"Not a valid plugin: {result['error']}"
+                )
+                continue
+            outputs = result["outputs"]
+            try:
+                metadata[package] = (
+                    json.loads(outputs["settings"]),
+                    json.loads(outputs["aux_info"]) if "aux_info" in outputs else {},
+                )
+            except json.JSONDecodeError as e:
+                metadata[package] = MetadataError(f"Invalid metadata output: {e}")
+        return metadata
 
 
 class PluginCollectorBase(ABC):
@@ -169,182 +813,295 @@ class PluginCollectorBase(ABC):
     def plugin_type(self) -> str:
         raise NotImplementedError()
 
+    # statement printing auxiliary info on the loaded `plugin` as JSON
+    aux_info_statement: Optional[str] = None
+
     def aux_info(self, metadata_collector) -> Dict[str, Any]:
-        return {}
+        if self.aux_info_statement is None:
+            return {}
+        return json.loads(metadata_collector.extract_info(self.aux_info_statement))
+
+    def prefix(self) -> str:
+        return f"snakemake-{self.plugin_type()}-plugin-"
+
+    def _record_context(self, package: str, record: PluginRecord) -> Dict[str, Any]:
+        """
+        Return the context for rendering the page of `package` as far as it can
+        be derived from its PyPI `record` alone.
+        """
+        repository = _repository_url(record)
+        repository_type = None
+        docs_warning = ""
+        if repository is None:
+            docs_warning = (
+                "No repository URL found in Pypi metadata. The plugin should "
+                "specify a repository URL in its pyproject.toml (key 'repository'). "
+                "It is unclear whether the plugin is maintained and reviewed by "
+                "the official Snakemake organization (https://github.com/snakemake)."
+            )
+        elif repository.startswith("https://github.com"):
+            repository_type = "github"
+        elif repository.startswith("https://gitlab.com"):
+            repository_type = "gitlab"
+
+        return dict(
+            plugin_name=package.removeprefix(self.prefix()),
+            package_name=package,
+            authors=record.authors,
+            repository=repository,
+            # Get repository shortname for shields.io badges
+            repo_shortname=get_repo_shortname(repository) if repository else None,
+            repository_type=repository_type,
+            commit_info=None,
+            commit_url=repository,
+            record=asdict(record),
+            docs_intro=None,
+            docs_further=None,
+            docs_warning=docs_warning,
+            plugin_type=self.plugin_type(),
+            settings={},
+            error=None,
+            timed_out=False,
+        )
 
-    def collect_plugins(self, plugins, packages, templates, snakemake_compat_index):
+    def pending_plugin(self, package: str, record: PluginRecord) -> Dict[str, Any]:
+        """
+        Return the context of a plugin that could not be collected yet in this
+        run (see _collect), showing its PyPI metadata only.
         """
-        Collect plugins of the type of the corresponding plugin type collector class.
-        Plugins are selected from the set of ALL pypi packages by matching names to the
-        expected prefix of 'snakemake-{plugin_type}-plugin-'. For each matching package
-        metadata is then extracted, the provided `templates` are rendered using this
-        information, and the plugin name is appended to `plugins`.
+        return {
+            **self._record_context(package, record),
+            "error": "This plugin has not been collected yet, since the time budget "
+            "of this build of the catalog was used up. It will be collected in one "
+            "of the next builds.",
+            "timed_out": True,
+        }
+
+    def collect_plugin(
+        self,
+        package: str,
+        record: PluginRecord,
+        forge_api: Optional["ForgeApi"] = None,
+        metadata=None,
+        stages: Optional[Dict[str, float]] = None,
+        budget: Optional[Budget] = None,
+    ) -> Dict[str, Any]:
+        """
+        Collect metadata of a single plugin `package` and return it as the
+        (JSON serializable) context for rendering its page via render_plugin.
+        Failures are recorded in the context for display. If the plugin ran out of
+        time (its `budget`, by default DEADLINES.plugin), the context is marked as
+        `timed_out`. The compatible Snakemake versions are added by _collect for
+        all plugins at once. The settings and auxiliary info are extracted from an
+        environment of their own, unless already given as `metadata` (see
+        _collect_group_metadata). The time spent in each stage is added to
+        `stages` if given.
         """
         plugin_type = self.plugin_type()
-        plugin_dir = Path("plugins") / plugin_type
-        if plugin_dir.exists():
-            shutil.rmtree(plugin_dir)
-        plugin_dir.mkdir(parents=True, exist_ok=True)
-        prefix = f"snakemake-{plugin_type}-plugin-"
-        packages = [package for package in packages if package.startswith(prefix)]
-        for package in packages:
-            if TEST_PACKAGES is not None and package not in TEST_PACKAGES:
-                continue
 
-            print("Collecting", package, file=sys.stderr)
+        print("Collecting", package, file=sys.stderr)
+        budget = budget or Budget(DEADLINES.plugin)
+        version = record.version
+        context = self._record_context(package, record)
+
+        error = None
+        timed_out = False
+
+        docs_warning = context["docs_warning"]
+        repository = context["repository"]
+        repository_type = context["repository_type"]
+
+        commit_info = None
+        commit_url = repository
+        docs_intro = None
+        docs_further = None
+
+        # Fetch git info (commit + docs) in a single clone operation, or from
+        # the batched forge API results
+        git_info = None
+        if repository:
+            get_git_info = (
+                forge_api.get_plugin_git_info if forge_api else _get_plugin_git_info
+            )
             try:
-                meta = pypi_api(f"https://pypi.org/pypi/{package}/json")
-            except MetadataError as e:
+                with _timed(stages, "git"):
+                    git_info = get_git_info(
+                        repository, timeout=budget.timeout(DEADLINES.git)
+                    )
+            except DeadlineExceeded as e:
                 e.log(package)
-                print(
-                    f"Skipping {package} because pypi does not provide metadata.",
-                    file=sys.stderr,
+        if git_info:
+            if git_info.commit:
+                commit_info = {
+                    "sha": git_info.commit.sha,
+                    "date": git_info.commit.date,
+                }
+                commit_url = _commit_url(
+                    repository, repository_type, git_info.commit.sha
                 )
-                continue
-            plugin_name = package.removeprefix(prefix)
-            desc = "\n".join(meta["info"]["description"].split("\n")[2:])
-            version = meta["info"]["version"]
-
-            # convert to rst
-            desc = m2r2.convert(desc)
-
-            error = None
-            repository = None
-
-            def get_setting_meta(setting, key, default="", verb=False):
-                value = setting.get(key, default)
-                if verb:
-                    return f"``{repr(value)}``"
-                elif isinstance(value, list):
-                    return ", ".join(value)
-                elif isinstance(value, bool):
-                    return "✓" if value else "✗"
-                elif value is None:
-                    return default
-                return value
-
-            docs_warning = ""
-            info = meta.get("info") or dict()
-            project_urls = info.get("project_urls") or dict()
-
-            author_info = info.get("author") or info.get("author_email")
-            authors = (
-                [author.strip() for author in author_info.split(",")]
-                if author_info
-                else []
-            )
 
-            repository = project_urls.get("Repository") or project_urls.get(
-                "repository"
-            )
-            # Clean up repository URL early - remove .git suffix and trailing slashes
-            if repository:
-                repository = repository.replace(".git", "").rstrip("/")
+            # Convert docs from markdown to RST
+            docs_intro = _convert_markdown_to_rst(git_info.docs.intro, "intro")
+            docs_further = _convert_markdown_to_rst(git_info.docs.further, "further")
 
-            repository_type = None
-            if repository is None:
+            if docs_intro is None and docs_further is None:
                 docs_warning = (
-                    "No repository URL found in Pypi metadata. The plugin should "
-                    "specify a repository URL in its pyproject.toml (key 'repository'). "
-                    "It is unclear whether the plugin is maintained and reviewed by "
-                    "the official Snakemake organization (https://github.com/snakemake)."
+                    f"No documentation found in repository {repository}. The plugin should "
+                    "provide a docs/intro.md with some introductory sentences and "
+                    "optionally a docs/further.md file with details beyond the "
+                    "auto-generated usage instructions presented in this catalog."
                 )
-            else:
-                if repository.startswith("https://github.com"):
-                    repository_type = "github"
-                elif repository.startswith("https://gitlab.com"):
-                    repository_type = "gitlab"
-
-            commit_info = None
-            commit_url = repository
-            docs_intro = None
-            docs_further = None
-
-            # Fetch git info (commit + docs) in a single clone operation
-            if repository and (git_info := _get_plugin_git_info(repository)):
-                if git_info.commit:
-                    commit_info = {
-                        "sha": git_info.commit.sha,
-                        "date": git_info.commit.date,
-                    }
-                    commit_url = _commit_url(
-                        repository, repository_type, git_info.commit.sha
-                    )
 
-                # Convert docs from markdown to RST
-                docs_intro = _convert_markdown_to_rst(git_info.docs.intro, "intro")
-                docs_further = _convert_markdown_to_rst(
-                    git_info.docs.further, "further"
-                )
+        settings = {}
+        aux_info = {}
 
-                if docs_intro is None and docs_further is None:
-                    docs_warning = (
-                        f"No documentation found in repository {repository}. The plugin should "
-                        "provide a docs/intro.md with some introductory sentences and "
-                        "optionally a docs/further.md file with details beyond the "
-                        "auto-generated usage instructions presented in this catalog."
-                    )
+        try:
+            if isinstance(metadata, MetadataError):
+                raise metadata
+            elif metadata is not None:
+                settings, aux_info = metadata
+            else:
+                with ExitStack() as stack:
+                    with _timed(stages, "install"):
+                        collector = stack.enter_context(
+                            MetadataCollector(
+                                package,
+                                plugin_type,
+                                version,
+                                budget=budget,
+                            )
+                        )
+                    with _timed(stages, "extract"):
+                        settings = collector.get_settings()
+                        aux_info = self.aux_info(collector)
+        except MetadataError as e:
+            e.log(package)
+            error = str(e)
+            timed_out = isinstance(e, DeadlineExceeded)
+            # go on, just with error registered for display
+
+        if error is not None:
+            if repository is not None:
+                error += f"\n\nPlease file a corresponding issue in the plugin's `repository <{repository}>`__ (if there is none yet)."
+            else:
+                error += "\n\nPlease contact the plugin authors."
+
+        return dict(
+            context,
+            commit_info=commit_info,
+            commit_url=commit_url,
+            docs_intro=docs_intro,
+            docs_further=docs_further,
+            docs_warning=docs_warning,
+            settings=settings,
+            error=error,
+            timed_out=timed_out,
+            **aux_info,
+        )
 
-            commit_date_label = (
-                _commit_date_label(commit_info["date"]) if commit_info else None
-            )
-            commit_age_color = (
-                _commit_age_color(commit_info["date"]) if commit_info else None
-            )
 
-            snakemake_version = _plugin_min_snakemake(
-                meta["info"].get("requires_dist"), snakemake_compat_index
+def _get_setting_meta(setting, key, default="", verb=False):
+    value = setting.get(key, default)
+    if verb:
+        return f"``{repr(value)}``"
+    elif isinstance(value, list):
+        return ", ".join(value)
+    elif isinstance(value, bool):
+        return "✓" if value else "✗"
+    elif value is None:
+        return default
+    return value
+
+
+def _plugin_badges(
+    context: Dict[str, Any],
+    commit_age_color: Optional[str],
+    commit_date_label: Optional[str],
+) -> List[Badge]:
+    """Return the badges of a plugin page, as rendered by badges.Badge."""
+    repository = context["repository"]
+    pypi_url = f"https://pypi.org/project/{context['package_name']}"
+    badges = [
+        Badge(
+            "repository",
+            (context["repository_type"] or "other") if repository else "unknown",
+            "#022c22",
+            repository,
+        )
+    ]
+    if context["commit_info"] is not None:
+        badges += [
+            Badge(
+                "last commit",
+                context["commit_info"]["sha"],
+                commit_age_color,
+                context["commit_url"],
+            ),
+            Badge(
+                "last updated",
+                commit_date_label.replace("_", " "),
+                commit_age_color,
+                context["commit_url"],
+            ),
+        ]
+    badges += [
+        Badge("author", author, "#064e3b", pypi_url) for author in context["authors"]
+    ]
+    badges += [
+        Badge("pypi", f"v{context['record']['version']}", "#047857", pypi_url),
+        Badge(
+            "license", context["record"]["license"] or "unknown", "#10b981", pypi_url
+        ),
+    ]
+    if context.get("snakemake_version") is not None:
+        badges.append(
+            Badge(
+                "snakemake",
+                context["snakemake_version"],
+                "#0ea5e9",
+                "https://snakemake.readthedocs.io",
             )
+        )
+    return badges
 
-            settings = {}
-            aux_info = {}
-
-            try:
-                with MetadataCollector(package, plugin_type, version) as collector:
-                    settings = collector.get_settings()
-                    aux_info = self.aux_info(collector)
-            except MetadataError as e:
-                error = str(e)
-                e.log(package)
-                # go on, just with error registered for display
-
-            if error is not None:
-                if repository is not None:
-                    error += f"\n\nPlease file a corresponding issue in the plugin's `repository <{repository}>`__ (if there is none yet)."
-                else:
-                    error += "\n\nPlease contact the plugin authors."
-
-            # Get repository shortname for shields.io badges
-            repo_shortname = get_repo_shortname(repository) if repository else None
-
-            rendered = templates.get_template(f"{plugin_type}_plugin.rst.j2").render(
-                plugin_name=plugin_name,
-                package_name=package,
-                authors=authors,
-                repository=repository,
-                repo_shortname=repo_shortname,
-                repository_type=repository_type,
-                commit_info=commit_info,
-                commit_url=commit_url,
-                commit_age_color=commit_age_color,
-                commit_date_label=commit_date_label,
-                snakemake_version=snakemake_version,
-                meta=meta,
-                desc=desc,
-                docs_intro=docs_intro,
-                docs_further=docs_further,
-                docs_warning=docs_warning,
-                plugin_type=plugin_type,
-                settings=settings,
-                get_setting_meta=get_setting_meta,
-                error=error,
-                textwrap=textwrap,
-                **aux_info,
-            )
-            with open((plugin_dir / plugin_name).with_suffix(".rst"), "w") as f:
-                f.write(rendered)
 
-            plugins[plugin_type].append(plugin_name)
+def render_plugin(
+    templates,
+    context: Dict[str, Any],
+    last_refreshed: Optional[str] = None,
+    remote_badges: bool = False,
+) -> str:
+    """
+    Render the page of a plugin from the context returned by collect_plugin.
+    Values that depend on the current date are derived here, such that stored
+    contexts can be rendered again later. If given, `last_refreshed` (an ISO
+    timestamp) is shown as the date the information was collected. With
+    `remote_badges`, the badges are served by shields.io instead of inlined.
+    """
+    commit_info = context["commit_info"]
+    commit_age_color = _commit_age_color(commit_info["date"]) if commit_info else None
+    commit_date_label = _commit_date_label(commit_info["date"]) if commit_info else None
+    return templates.get_template(f"{context['plugin_type']}_plugin.rst.j2").render(
+        **{
+            **context,
+            "record": PluginRecord(**context["record"]),
+        },
+        commit_age_color=commit_age_color,
+        commit_date_label=commit_date_label,
+        remote_badges=remote_badges,
+        badges=[
+            badge.html()
+            for badge in _plugin_badges(context, commit_age_color, commit_date_label)
+        ],
+        last_refreshed=(
+            datetime.fromisoformat(last_refreshed).strftime("%Y-%m-%d %H:%M UTC")
+            if last_refreshed
+            else None
+        ),
+        get_setting_meta=_get_setting_meta,
+        format_snakemake_ranges=_format_snakemake_ranges,
+        textwrap=textwrap,
+    )
 
 
 class ExecutorPluginCollector(PluginCollectorBase):
@@ -361,15 +1118,13 @@ class StoragePluginCollector(PluginCollectorBase):
     def plugin_type(self) -> str:
         return "storage"
 
-    def aux_info(self, metadata_collector) -> Dict[str, Any]:
-        info = metadata_collector.extract_info(
-            "import json; "
-            "queries = plugin.storage_provider.example_queries(); "
-            "print(json.dumps({'example_queries': ["
-            "{'query': qry.query, 'desc': qry.description, 'type': qry.type.name.lower()} "
-            "for qry in queries]}))"
-        )
-        return json.loads(info)
+    aux_info_statement = (
+        "import json; "
+        "queries = plugin.storage_provider.example_queries(); "
+        "print(json.dumps({'example_queries': ["
+        "{'query': qry.query, 'desc': qry.description, 'type': qry.type.name.lower()} "
+        "for qry in queries]}))"
+    )
 
 
 class LoggerPluginCollector(PluginCollectorBase):
@@ -408,6 +1163,17 @@ def _commit_url(
         return repository
 
 
+def _repository_url(record: PluginRecord) -> Optional[str]:
+    """Return the cleaned up repository URL declared in the plugin's metadata."""
+    repository = record.project_urls.get("Repository") or record.project_urls.get(
+        "repository"
+    )
+    # Clean up repository URL early - remove .git suffix and trailing slashes
+    if repository:
+        repository = repository.replace(".git", "").rstrip("/")
+    return repository
+
+
 def get_repo_shortname(repository: Optional[str]) -> str:
     """Extract the shortname from repository URL for shields.io badges.
 
@@ -434,11 +1200,16 @@ def get_repo_shortname(repository: Optional[str]) -> str:
     return cleaned
 
 
-def _commit_age_color(date_str: str) -> str:
-    """Return a shields.io color hex based on how old the commit date is."""
+def _commit_age_months(date_str: str) -> int:
+    """Return the number of calendar months since the given ISO date."""
     dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
     now = datetime.now(timezone.utc)
-    months = (now.year - dt.year) * 12 + (now.month - dt.month)
+    return (now.year - dt.year) * 12 + (now.month - dt.month)
+
+
+def _commit_age_color(date_str: str) -> str:
+    """Return a shields.io color hex based on how old the commit date is."""
+    months = _commit_age_months(date_str)
     if months < 6:
         return "%2316a34a"  # green
     elif months < 24:
@@ -463,6 +1234,8 @@ def _build_snakemake_compat_index() -> list[tuple]:
     Example: (Version("8.0.0"), "snakemake-interface-executor-plugins", Version("1.0"), Version("2.0"))
     means Snakemake 8.0 requires executor interface >=1.0,<2.0
     """
+    from packaging.specifiers import SpecifierSet
+
     print("Building Snakemake compatibility index...", file=sys.stderr)
     meta = pypi_api("https://pypi.org/pypi/snakemake/json")
 
@@ -484,12 +1257,15 @@ def _build_snakemake_compat_index() -> list[tuple]:
 
     for snakemake_ver in all_versions:
         try:
-            ver_meta = pypi_api(f"https://pypi.org/pypi/snakemake/{snakemake_ver}/json")
+            ver_info = pypi_api(
+                f"https://pypi.org/pypi/snakemake/{snakemake_ver}/json",
+                parse=_parse_pypi_info,
+            )
         except MetadataError:
             continue
 
         current_requirements = {}
-        for dep in ver_meta["info"].get("requires_dist") or []:
+        for dep in ver_info.get("requires_dist") or []:
             match = _INTERFACE_PKG_RE.search(dep)
             if not match:
                 continue
@@ -517,93 +1293,1393 @@ def _build_snakemake_compat_index() -> list[tuple]:
     return sorted(entries, key=lambda e: e[0])
 
 
-def _plugin_min_snakemake(
-    requires_dist: list[str] | None,
-    compat_index: list[tuple],
-) -> str | None:
-    """Return the minimum Snakemake version compatible with a plugin.
-
-    A plugin is compatible with a Snakemake version if their interface version requirements overlap.
+def _interface_lower_bounds(requires_dist: Optional[List[str]]) -> Dict[str, Version]:
+    """Return the lower bound of each plugin interface requirement of a plugin."""
+    from packaging.specifiers import SpecifierSet
 
-    Example:
-        Plugin requires: interface >=2.5
-        Snakemake 8.1 requires: interface >=2.0,<3.0
-        Overlap: [2.5, 3.0) -> Compatible!
+    bounds = {}
+    for dep in requires_dist or []:
+        match = _INTERFACE_PKG_RE.search(dep)
+        if not match:
+            continue
+        lower = None
+        for s in SpecifierSet(match.group(2).strip()):
+            if s.operator in (">=", ">"):
+                v = Version(s.version)
+                lower = v if lower is None else max(lower, v)
+        if lower is not None:
+            bounds[match.group(1)] = lower
+    return bounds
 
-        Plugin requires: interface >=1.5
-        Snakemake 8.1 requires: interface >=2.0,<3.0
-        No overlap: plugin allows 1.5-1.9 which Snakemake doesn't support -> Incompatible
 
-    Returns:
-        Minimum Snakemake version string like ">=8.1" or None if incompatible
+class CompatibilityMatrix:
     """
-    if not requires_dist:
-        return None
+    Compatibility of plugins with the Snakemake releases of a compat index (see
+    _build_snakemake_compat_index), computed for all plugins and releases at once.
 
-    # Extract plugin's interface requirement
-    plugin_iface = None
-    plugin_lower = None
-    for dep in requires_dist:
-        match = _INTERFACE_PKG_RE.search(dep)
-        if match:
-            plugin_iface = match.group(1)
-            spec = SpecifierSet(match.group(2).strip())
-            for s in spec:
-                if s.operator in (">=", ">"):
-                    v = Version(s.version)
-                    plugin_lower = v if plugin_lower is None else max(plugin_lower, v)
-            break
+    A plugin is compatible with a Snakemake release if the lower bound of each of
+    its interface requirements lies within the range that Snakemake requires for
+    that interface. The releases are those at which the interface requirements of
+    Snakemake changed, each standing for all releases up to the next one.
+    """
 
-    if plugin_lower is None or plugin_iface is None:
-        return None
+    def __init__(
+        self, plugins: Dict[str, Optional[List[str]]], compat_index: list[tuple]
+    ):
+        import numpy as np
+
+        self.releases = sorted({entry[0] for entry in compat_index})
+        self._plugins = {plugin: i for i, plugin in enumerate(plugins)}
+        bounds = [_interface_lower_bounds(requires) for requires in plugins.values()]
+        interfaces = {
+            iface: i
+            for i, iface in enumerate(
+                sorted(
+                    {entry[1] for entry in compat_index}
+                    | {iface for plugin_bounds in bounds for iface in plugin_bounds}
+                )
+            )
+        }
+        # versions are compared by their rank among all versions involved
+        versions = sorted(
+            {v for entry in compat_index for v in entry[2:] if v is not None}
+            | {v for plugin_bounds in bounds for v in plugin_bounds.values()}
+        )
+        rank = {v: i for i, v in enumerate(versions)}
+        releases = {release: i for i, release in enumerate(self.releases)}
+
+        # interface ranges required by each release, [lower, upper)
+        shape = (len(self.releases), len(interfaces))
+        provided = np.zeros(shape, dtype=bool)
+        lower = np.full(shape, -1)
+        upper = np.full(shape, len(versions))
+        for release, iface, iface_lower, iface_upper in compat_index:
+            i, j = releases[release], interfaces[iface]
+            provided[i, j] = True
+            if iface_lower is not None:
+                lower[i, j] = rank[iface_lower]
+            if iface_upper is not None:
+                upper[i, j] = rank[iface_upper]
+
+        # interface lower bounds required by each plugin
+        shape = (len(plugins), len(interfaces))
+        required = np.zeros(shape, dtype=bool)
+        plugin_lower = np.zeros(shape, dtype=int)
+        for i, plugin_bounds in enumerate(bounds):
+            for iface, v in plugin_bounds.items():
+                required[i, interfaces[iface]] = True
+                plugin_lower[i, interfaces[iface]] = rank[v]
+
+        # broadcast to (release, plugin, interface)
+        plugin_lower = plugin_lower[np.newaxis]
+        matches = (
+            provided[:, np.newaxis]
+            & (lower[:, np.newaxis] <= plugin_lower)
+            & (plugin_lower < upper[:, np.newaxis])
+        )
+        # (release, plugin), plugins without interface requirement match nothing
+        self.matrix = (matches | ~required[np.newaxis]).all(axis=2) & required.any(
+            axis=1
+        )
 
-    # Find first Snakemake version with overlapping interface requirement
-    for snakemake_ver, iface_pkg, snakemake_lower, snakemake_upper in compat_index:
-        if iface_pkg != plugin_iface:
-            continue
+    def _compatible(self, plugin: str):
+        return self.matrix[:, self._plugins[plugin]]
 
-        # Check if [plugin_lower, ∞) overlaps with [snakemake_lower, snakemake_upper)
-        # No overlap if plugin needs older version than Snakemake provides
-        if snakemake_lower is not None and plugin_lower < snakemake_lower:
-            continue
+    def min_snakemake(self, plugin: str) -> Optional[str]:
+        """Return the minimum compatible Snakemake version like ">=8.1", if any."""
+        import numpy as np
 
-        # No overlap if plugin needs newer version than Snakemake supports
-        if snakemake_upper is not None and plugin_lower >= snakemake_upper:
-            continue
+        compatible = np.flatnonzero(self._compatible(plugin))
+        if not len(compatible):
+            return None
+        release = self.releases[compatible[0]]
+        return f">={release.major}.{release.minor}"
 
-        # Found compatible version
-        return f">={snakemake_ver.major}.{snakemake_ver.minor}"
+    def ranges(self, plugin: str) -> List[List[Optional[str]]]:
+        """
+        Return the compatible Snakemake versions as [lower, upper) ranges, with
+        upper being None for ranges that include the latest release.
+        """
+        import numpy as np
 
-    return None
+        # edges of runs of compatible releases
+        padded = np.concatenate(([False], self._compatible(plugin), [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        return [
+            [
+                str(self.releases[start]),
+                str(self.releases[end]) if end < len(self.releases) else None,
+            ]
+            for start, end in zip(edges[::2], edges[1::2])
+        ]
 
 
-def collect_plugins():
-    templates = Environment(
-        loader=FileSystemLoader("_templates"),
-        autoescape=select_autoescape(),
-        trim_blocks=True,
-        lstrip_blocks=True,
+def _format_snakemake_ranges(ranges: List[List[Optional[str]]]) -> str:
+    return " or ".join(
+        f">={lower},<{upper}" if upper is not None else f">={lower}"
+        for lower, upper in ranges
     )
 
-    plugins = defaultdict(list)
-    snakemake_compat_index = _build_snakemake_compat_index()
+
+@dataclass
+class _PluginGroup:
+    interface: Optional[str]
+    spec: Optional["SpecifierSet"]
+    members: List[str]
+
+
+def group_plugins(
+    plugins: Dict[str, Optional[List[str]]], max_size: int = 16
+) -> List[List[str]]:
+    """
+    Group plugin packages (package -> requires_dist) of the same type whose
+    interface requirements are compatible, such that they can be installed into
+    one environment. Requirements are considered compatible if a version they
+    all admit is among the versions mentioned by any of them. Plugins without
+    interface requirement are not grouped. Groups are ordered by their first
+    member and keep the given order of packages.
+    """
+    from packaging.specifiers import SpecifierSet
+
+    requirements = {}
+    for package, requires_dist in plugins.items():
+        for dep in requires_dist or []:
+            if match := _INTERFACE_PKG_RE.search(dep):
+                requirements[package] = (
+                    match.group(1),
+                    SpecifierSet(match.group(2).strip()),
+                )
+                break
+    candidates = sorted(
+        {Version(s.version) for _, spec in requirements.values() for s in spec}
+    )
+
+    groups = []
+    for package in plugins:
+        if package not in requirements:
+            groups.append(_PluginGroup(None, None, [package]))
+            continue
+        interface, spec = requirements[package]
+        for group in groups:
+            if group.interface != interface or len(group.members) >= max_size:
+                continue
+            combined = group.spec & spec
+            if any(combined.contains(v, prereleases=True) for v in candidates):
+                group.spec = combined
+                group.members.append(package)
+                break
+        else:
+            groups.append(_PluginGroup(interface, spec, [package]))
+    return [group.members for group in groups]
+
+
+def _collect_group_metadata(
+    collector: "PluginCollectorBase",
+    packages: Dict[str, str],
+    budget: Optional[Budget] = None,
+) -> Dict[str, Any]:
+    """
+    Install the given plugin packages (package -> version) into one environment
+    and extract their metadata in one interpreter. If that fails, the group is
+    split in halves, which are tried on their own. Returns the metadata of each
+    package as given by GroupMetadataCollector.collect. Packages that cannot be
+    installed along with any other one are left out, to be collected on their own,
+    as are all packages of a group that runs out of time, since its halves would
+    be unlikely to do better. All attempts share the `budget` (by default
+    _group_seconds of the whole group).
+    """
+    if len(packages) < 2:
+        return {}
+    budget = budget or Budget(_group_seconds(len(packages)))
+    plugin_type = collector.plugin_type()
+    try:
+        with GroupMetadataCollector(packages, plugin_type, budget=budget) as group:
+            return group.collect(collector.aux_info_statement)
+    except DeadlineExceeded as e:
+        print(
+            f"Collecting group of {len(packages)} {plugin_type} plugins on their "
+            f"own: {e}",
+            file=sys.stderr,
+        )
+        return {}
+    except MetadataError as e:
+        print(
+            f"Splitting group of {len(packages)} {plugin_type} plugins: {e}",
+            file=sys.stderr,
+        )
+    items = list(packages.items())
+    half = len(items) // 2
+    return {
+        **_collect_group_metadata(collector, dict(items[:half]), budget),
+        **_collect_group_metadata(collector, dict(items[half:]), budget),
+    }
+
+
+def _plugin_min_snakemake(
+    requires_dist: list[str] | None,
+    compat_index: list[tuple],
+) -> str | None:
+    """Return the minimum Snakemake version compatible with a plugin.
+
+    A plugin is compatible with a Snakemake version if their interface version requirements overlap
+    (see CompatibilityMatrix, which computes this for all plugins at once).
+
+    Example:
+        Plugin requires: interface >=2.5
+        Snakemake 8.1 requires: interface >=2.0,<3.0
+        Overlap: [2.5, 3.0) -> Compatible!
+
+        Plugin requires: interface >=1.5
+        Snakemake 8.1 requires: interface >=2.0,<3.0
+        No overlap: plugin allows 1.5-1.9 which Snakemake doesn't support -> Incompatible
+
+    Returns:
+        Minimum Snakemake version string like ">=8.1" or None if incompatible
+    """
+    return CompatibilityMatrix({"plugin": requires_dist}, compat_index).min_snakemake(
+        "plugin"
+    )
+
+
+COLLECTORS = (
+    ExecutorPluginCollector,
+    StoragePluginCollector,
+    ReportPluginCollector,
+    LoggerPluginCollector,
+    SchedulerPluginCollector,
+)
+
+SHARD_MANIFEST = "shard.json"
+
+
+def _get_templates(path: Path = Path("_templates")) -> "Environment":
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(path),
+        autoescape=select_autoescape(),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+def _write_index(templates, plugins, base_dir: Path = Path(".")) -> None:
+    with open(base_dir / "index.rst", "w") as f:
+        f.write(templates.get_template("index.rst.j2").render(plugins=plugins))
+
+
+# Plugin pages are stored as the data they are rendered from, see plugin_pages.py.
+PAGE_SUFFIX = ".json"
+
+
+def _page_path(plugin_type: str, plugin_name: str) -> Path:
+    return Path("plugins") / plugin_type / f"{plugin_name}{PAGE_SUFFIX}"
+
+
+def render_page(templates, package: str, base_dir: Path = Path(".")) -> str:
+    """
+    Render the page of a plugin `package` from the page data written below
+    `base_dir` by the last collection, without collecting anything.
+    """
+    for collector in COLLECTORS:
+        prefix = collector().prefix()
+        if package.startswith(prefix):
+            path = base_dir / _page_path(
+                collector().plugin_type(), package.removeprefix(prefix)
+            )
+            break
+    else:
+        raise ValueError(f"{package} is not a Snakemake plugin package.")
+    with open(path) as f:
+        page = json.load(f)
+    return render_plugin(
+        templates,
+        page["context"],
+        page["last_refreshed"],
+        page.get("remote_badges", False),
+    )
+
+
+def _write_if_changed(path: Path, content: str) -> None:
+    """
+    Write `content` to `path` unless it is already there, such that Sphinx only
+    considers pages whose data has changed as outdated.
+    """
+    try:
+        if path.read_text() == content:
+            return
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _write_page(
+    base_dir: Path,
+    context: Dict[str, Any],
+    last_refreshed: Optional[str] = None,
+    remote_badges: bool = False,
+) -> Path:
+    """
+    Write the page of a plugin below `base_dir`, i.e. its render context, when
+    it was collected (if not in this run) and whether to render remote badges
+    (see render_plugin), and return its relative path.
+    """
+    page = _page_path(context["plugin_type"], context["plugin_name"])
+    _write_if_changed(
+        base_dir / page,
+        json.dumps(
+            {
+                "context": context,
+                "last_refreshed": last_refreshed,
+                "remote_badges": remote_badges,
+            },
+            indent=1,
+        ),
+    )
+    return page
+
+
+def _prune_pages(base_dir: Path, pages) -> None:
+    """Remove all files below `base_dir/plugins` that are not among `pages`."""
+    keep = {base_dir / page for page in pages}
+    for collector in COLLECTORS:
+        plugin_dir = base_dir / "plugins" / collector().plugin_type()
+        plugin_dir.mkdir(parents=True, exist_ok=True)
+        for path in plugin_dir.iterdir():
+            if path not in keep:
+                path.unlink()
+
+
+def _write_compatibility_table(
+    templates, facets: List[Dict[str, Any]], base_dir: Path = Path(".")
+) -> None:
+    """Render the table of compatible Snakemake versions of all plugins."""
+    with open(base_dir / "compatibility.rst", "w") as f:
+        f.write(
+            templates.get_template("compatibility.rst.j2").render(
+                plugins=facets, format_snakemake_ranges=_format_snakemake_ranges
+            )
+        )
+
+
+FACET_INDEX = Path("_extra") / "plugin-facets.json"
+
+_QUERY_SCHEME_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9+.-]*://)")
+
+# commit age buckets of the facet index, matching the colors of _commit_age_color
+_UPDATED_BUCKETS = ((6, "within 6 months"), (24, "within 2 years"))
+
+
+def _plugin_facets(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the facets of a plugin for the search index of the catalog."""
+    settings = context["settings"] or []
+    snakemake_version = context["snakemake_version"]
+    commit_info = context["commit_info"]
+    updated = None
+    if commit_info:
+        months = _commit_age_months(commit_info["date"])
+        updated = next(
+            (label for limit, label in _UPDATED_BUCKETS if months < limit),
+            "more than 2 years ago",
+        )
+    return {
+        "name": context["plugin_name"],
+        "type": context["plugin_type"],
+        "summary": context["record"]["summary"] or "",
+        "settings": sorted(
+            {setting["name"] for setting in settings if setting.get("name")}
+            | {setting["env_var"] for setting in settings if setting.get("env_var")}
+        ),
+        "schemes": sorted(
+            {
+                match.group(1)
+                for example in context.get("example_queries") or []
+                if (match := _QUERY_SCHEME_RE.match(example["query"]))
+            }
+        ),
+        "snakemake": snakemake_version.removeprefix(">=")
+        if snakemake_version
+        else None,
+        "updated": updated,
+        "snakemake_compatible": context.get("snakemake_compatible") or [],
+    }
+
+
+def _write_facet_index(facets: List[Dict[str, Any]], base_dir: Path = Path(".")):
+    """
+    Write the faceted search index of the catalog, loaded by the filter on the
+    landing page. Plugins are listed once as [name, type, summary], and each facet
+    value maps to the (sorted) positions of the matching plugins, such that the
+    client only has to intersect precomputed lists. The snakemake facet maps each
+    Snakemake version bounding a compatible range to all plugins that work with it,
+    such that plugins capped below newer releases are left out of these.
+    """
+    index = {
+        "plugins": [
+            [entry["name"], entry["type"], entry["summary"]] for entry in facets
+        ],
+        "facets": {"type": {}, "scheme": {}, "setting": {}, "updated": {}},
+    }
+    for i, entry in enumerate(facets):
+        index["facets"]["type"].setdefault(entry["type"], []).append(i)
+        for scheme in entry["schemes"]:
+            index["facets"]["scheme"].setdefault(scheme, []).append(i)
+        for setting in entry["settings"]:
+            index["facets"]["setting"].setdefault(setting.lower(), []).append(i)
+        if entry["updated"]:
+            index["facets"]["updated"].setdefault(entry["updated"], []).append(i)
+
+    # plugins without computed compatibility work with their minimum version onwards
+    ranges = [
+        entry.get("snakemake_compatible")
+        or ([[entry["snakemake"], None]] if entry["snakemake"] else [])
+        for entry in facets
+    ]
+    bounds = sorted(
+        {bound for plugin in ranges for rng in plugin for bound in rng if bound},
+        key=Version,
+    )
+    index["facets"]["snakemake"] = {
+        version: [
+            i
+            for i, plugin in enumerate(ranges)
+            if any(
+                Version(lower) <= Version(version)
+                and (upper is None or Version(version) < Version(upper))
+                for lower, upper in plugin
+            )
+        ]
+        for version in bounds
+    }
+
+    path = base_dir / FACET_INDEX
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+
+# converted plugin docs, which are shown as literal blocks if they are broken
+_DOC_FRAGMENTS = ("docs_intro", "docs_further")
+
+# relative to the source directory, outside of what is published (html_extra_path)
+VALIDATION_REPORT = Path("..") / "rst-validation.json"
+
+
+def _quarantined(context: Dict[str, Any], fragments) -> Dict[str, Any]:
+    return {
+        **context,
+        **{
+            fragment: "::\n\n" + textwrap.indent(context[fragment], "    ")
+            for fragment in fragments
+        },
+    }
+
+
+def _validate_pages(
+    pages: Dict[str, tuple], templates, remote_badges: bool = False
+) -> Dict[str, Any]:
+    """
+    Render the given pages (package -> (context, last_refreshed)) and check them
+    with docutils in a process pool (see validate_rst.py). The doc fragments
+    causing problems are quarantined as literal blocks, updating `pages` in
+    place. Returns the problems found, by package.
+    """
+
+    def render(package, fragments=()):
+        context, last_refreshed = pages[package]
+        return render_plugin(
+            templates, _quarantined(context, fragments), last_refreshed, remote_badges
+        )
+
+    if not pages:
+        return {}
+    import validate_rst
+
+    # spawned workers, as the stubs for Sphinx directives are registered globally
+    with ProcessPoolExecutor(
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=validate_rst.init_worker,
+    ) as pool:
+
+        def check(texts):
+            return list(pool.map(validate_rst.check_rst, texts, chunksize=8))
+
+        problems = dict(zip(pages, check([render(package) for package in pages])))
+        broken = [package for package in pages if problems[package]]
+        # quarantine each fragment on its own to find the broken ones
+        candidates = [
+            (package, fragment)
+            for package in broken
+            for fragment in _DOC_FRAGMENTS
+            if pages[package][0].get(fragment)
+        ]
+        quarantined = defaultdict(list)
+        for (package, fragment), remaining in zip(
+            candidates,
+            check([render(package, (fragment,)) for package, fragment in candidates]),
+        ):
+            if len(remaining) < len(problems[package]):
+                quarantined[package].append(fragment)
+        remaining = dict(
+            zip(
+                broken,
+                check([render(package, quarantined[package]) for package in broken]),
+            )
+        )
+
+    report = {}
+    for package in broken:
+        context, last_refreshed = pages[package]
+        if quarantined[package]:
+            context = _quarantined(context, quarantined[package])
+            context["docs_warning"] = (
+                (context["docs_warning"] + "\n\n" if context["docs_warning"] else "")
+                + "The documentation of this plugin contains invalid reStructuredText "
+                f"({', '.join(quarantined[package])}), which is therefore shown as is."
+            )
+            pages[package] = (context, last_refreshed)
+        print(
+            f"Found {len(problems[package])} RST problems in {package}"
+            + (
+                f", quarantined {', '.join(quarantined[package])}."
+                if quarantined[package]
+                else "."
+            ),
+            file=sys.stderr,
+        )
+        report[package] = {
+            "problems": problems[package],
+            "quarantined": quarantined[package],
+            "remaining": remaining[package],
+        }
+    return report
+
+
+def _write_validation_report(report: Dict[str, Any], base_dir: Path = Path(".")):
+    path = base_dir / VALIDATION_REPORT
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"plugins": report}, f, indent=2, sort_keys=True)
+
+
+def discover_plugin_packages(only: Optional[List[str]] = None) -> List[str]:
+    """
+    Return all plugin packages on PyPI, in the order of the PyPI index. If `only`
+    is given, the plugin packages among it are returned as given instead, without
+    fetching the (large) index. Packages missing on PyPI are skipped when
+    collecting.
+    """
+    prefixes = tuple(
+        f"snakemake-{collector().plugin_type()}-plugin-" for collector in COLLECTORS
+    )
+    if only is not None:
+        return [package for package in only if package.startswith(prefixes)]
+    from pypi_simple import PyPISimple
 
     with PyPISimple() as pypi_client:
         packages = pypi_client.get_index_page().projects
+    return [package for package in packages if package.startswith(prefixes)]
+
+
+class ResultStore:
+    """
+    Results of previous collections, stored as one JSON file per package with the
+    render context of the plugin, its version and the time it was collected.
+    Plugins that are not refreshed in a run are rendered from here.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _file(self, package: str) -> Path:
+        return self.path / f"{package}.json"
+
+    def load(self, package: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(package)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            print(f"Ignoring corrupt stored result of {package}: {e}", file=sys.stderr)
+            return None
+
+    def save(self, package: str, context: Dict[str, Any]) -> None:
+        self._write(
+            package,
+            {
+                "refreshed": datetime.now(timezone.utc).isoformat(),
+                "version": context["record"]["version"],
+                "failed": context["error"] is not None,
+                "context": context,
+            },
+        )
+
+    def _write(self, package: str, entry: Dict[str, Any]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self._file(package).with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        tmp.replace(self._file(package))
+
+    def copy_to(self, other: "ResultStore", packages: List[str]) -> None:
+        for package in packages:
+            if (entry := self.load(package)) is not None:
+                other._write(package, entry)
+
+    def import_from(self, other: "ResultStore") -> None:
+        """Take over all results of `other` that are newer than the stored ones."""
+        for path in sorted(other.path.glob("*.json")):
+            package = path.stem
+            entry = other.load(package)
+            current = self.load(package)
+            if entry is not None and (
+                current is None or current["refreshed"] < entry["refreshed"]
+            ):
+                self._write(package, entry)
+
+
+def _refresh_priority(record: PluginRecord, stored: Optional[Dict[str, Any]]):
+    """
+    Sort key for refreshing plugins: new plugins first, then plugins with a new
+    release, then the remaining ones by time since their last refresh, and
+    previously failed plugins last. These are the slowest to collect (every
+    installation attempt is made) and fail again unless fixed by a new release,
+    so they must not keep the refresh budget from reaching stale pages.
+    """
+    if stored is None:
+        return (0, "")
+    if stored["version"] != record.version:
+        return (1, stored["refreshed"])
+    if stored["failed"]:
+        return (3, stored["refreshed"])
+    return (2, stored["refreshed"])
+
+
+@fetch_scope()
+def _collect(
+    packages,
+    base_dir: Path,
+    durations=None,
+    store: Optional[ResultStore] = None,
+    refresh_budget: Optional[float] = None,
+    facets: Optional[List[Dict[str, Any]]] = None,
+    validation: Optional[Dict[str, Any]] = None,
+    grouped_envs: bool = False,
+    remote_badges: bool = False,
+):
+    """
+    Collect the given plugin packages and write their pages below `base_dir`.
+    The search facets of each rendered plugin are appended to `facets` if given.
+    Pages are validated before writing (see _validate_pages), the problems found
+    are added to `validation` if given.
+
+    The time spent on each plugin is added to `durations` if given, by stage
+    (see CostModel).
+
+    Plugins are refreshed in the order given by _refresh_priority. With a
+    `refresh_budget` (in seconds), no plugin takes longer than what is left of
+    it, and no further plugins are refreshed once it is used up. Those, as well
+    as plugins whose metadata cannot be retrieved or that run out of time, are
+    written from their last result in `store`, showing when it was collected.
+    Plugins without stored result get a page with their PyPI metadata only if
+    the budget is used up before they are collected (see
+    PluginCollectorBase.pending_plugin). Pages of other plugins are removed.
+    """
+    run_started = time.monotonic()
+    snakemake_compat_index = _build_snakemake_compat_index()
+    forge_api = ForgeApi.from_env()
+    collectors = [collector() for collector in COLLECTORS]
+
+    def stages(package):
+        return durations.setdefault(package, {}) if durations is not None else None
+
+    def budget(seconds: float) -> Budget:
+        """Return a budget of `seconds`, capped by the remaining refresh budget."""
+        if refresh_budget is not None:
+            seconds = min(seconds, refresh_budget - (time.monotonic() - run_started))
+        return Budget(seconds)
+
+    # the collector responsible for each package, in the order of `packages`
+    package_collectors = {}
+    for package in packages:
+        for collector in collectors:
+            if package.startswith(collector.prefix()):
+                package_collectors[package] = collector
+                break
+
+    # Records are fetched up front, as they are needed to prioritize plugins. The
+    # per-plugin budget thus only starts once a plugin is collected, the fetch is
+    # bounded by DEADLINES.pypi (including retries) on its own.
+    records = {}
+    stored = {}
+    for package in package_collectors:
+        stored[package] = store.load(package) if store is not None else None
+        try:
+            with _timed(stages(package), "pypi"):
+                records[package] = pypi_plugin_record(package)
+        except MetadataError as e:
+            e.log(package)
+            if stored[package] is None:
+                print(
+                    f"Skipping {package} because pypi does not provide metadata.",
+                    file=sys.stderr,
+                )
 
-    for collector in (
-        ExecutorPluginCollector,
-        StoragePluginCollector,
-        ReportPluginCollector,
-        LoggerPluginCollector,
-        SchedulerPluginCollector,
+    if forge_api is not None:
+        forge_api.prefetch(
+            repository
+            for record in records.values()
+            if (repository := _repository_url(record)) is not None
+        )
+
+    # groups of plugins sharing an environment, by package
+    groups = {}
+    if grouped_envs:
+        for collector in collectors:
+            for group in group_plugins(
+                {
+                    package: records[package].requires_dist
+                    for package in records
+                    if package_collectors[package] is collector
+                }
+            ):
+                for package in group:
+                    groups[package] = group
+    grouped = {}
+
+    refreshed = {}
+    for package in sorted(
+        records,
+        key=lambda package: _refresh_priority(records[package], stored[package]),
     ):
-        collector().collect_plugins(
-            plugins, packages, templates, snakemake_compat_index
+        if (
+            refresh_budget is not None
+            and time.monotonic() - run_started > refresh_budget
+        ):
+            print(
+                f"Refresh budget of {refresh_budget:.0f}s used up, rendering "
+                f"{len(records) - len(refreshed)} plugins from stored results.",
+                file=sys.stderr,
+            )
+            break
+        if package in groups and package not in grouped:
+            # extract the metadata of all members not refreshed yet
+            members = {
+                member: records[member].version
+                for member in groups[package]
+                if member not in refreshed
+            }
+            started = time.monotonic()
+            metadata = _collect_group_metadata(
+                package_collectors[package],
+                members,
+                budget(_group_seconds(len(members))),
+            )
+            # the shared installation is attributed to all members alike
+            for member in members:
+                grouped[member] = metadata.get(member)
+                member_stages = stages(member)
+                if member_stages is not None:
+                    member_stages["install"] = member_stages.get("install", 0.0) + (
+                        time.monotonic() - started
+                    ) / len(members)
+        context = package_collectors[package].collect_plugin(
+            package,
+            records[package],
+            forge_api=forge_api,
+            metadata=grouped.get(package),
+            stages=stages(package),
+            budget=budget(DEADLINES.plugin) if refresh_budget is not None else None,
         )
+        if context["timed_out"] and stored[package] is not None:
+            print(f"Keeping last known result of {package}.", file=sys.stderr)
+        else:
+            refreshed[package] = context
+            if store is not None:
+                store.save(package, context)
+
+    contexts = {}
+    for package in package_collectors:
+        if package in refreshed:
+            contexts[package] = (refreshed[package], None)
+        elif stored.get(package) is not None:
+            contexts[package] = (
+                stored[package]["context"],
+                stored[package]["refreshed"],
+            )
+        elif package in records:
+            contexts[package] = (
+                package_collectors[package].pending_plugin(package, records[package]),
+                None,
+            )
 
-    with open("index.rst", "w") as f:
-        f.write(templates.get_template("index.rst.j2").render(plugins=plugins))
+    # compatibility with the current Snakemake releases, also for stored results
+    compatibility = CompatibilityMatrix(
+        {
+            package: context["record"]["requires_dist"]
+            for package, (context, _) in contexts.items()
+        },
+        snakemake_compat_index,
+    )
+    for package, (context, last_refreshed) in contexts.items():
+        contexts[package] = (
+            {
+                **context,
+                "snakemake_version": compatibility.min_snakemake(package),
+                "snakemake_compatible": compatibility.ranges(package),
+            },
+            last_refreshed,
+        )
+    report = _validate_pages(contexts, _get_templates(), remote_badges)
+    if validation is not None:
+        validation.update(report)
+
+    plugins = defaultdict(list)
+    pages = []
+    for package, (context, last_refreshed) in contexts.items():
+        pages.append(_write_page(base_dir, context, last_refreshed, remote_badges))
+        plugins[package_collectors[package].plugin_type()].append(
+            context["plugin_name"]
+        )
+        if facets is not None:
+            facets.append(_plugin_facets(context))
+    _prune_pages(base_dir, pages)
+
+    # plugin types in the order of the collectors
+    return {
+        collector.plugin_type(): plugins[collector.plugin_type()]
+        for collector in collectors
+        if collector.plugin_type() in plugins
+    }
+
+
+def collect_plugins(
+    only: Optional[List[str]] = None, options: Optional[RunOptions] = None
+):
+    """
+    Collect all plugins (or those in `only`) and write their pages, the index,
+    the compatibility table, the facet index and the validation report. The
+    `options` default to RunOptions.from_env.
+    """
+    options = options or RunOptions.from_env()
+    facets = []
+    validation = {}
+    with _run_deadlines(options.deadlines):
+        plugins = _collect(
+            discover_plugin_packages(only),
+            Path("."),
+            store=ResultStore(options.state_dir),
+            refresh_budget=options.deadlines.refresh,
+            facets=facets,
+            validation=validation,
+            grouped_envs=options.grouped_envs,
+            remote_badges=options.remote_badges,
+        )
+    templates = _get_templates()
+    _write_index(templates, plugins)
+    _write_compatibility_table(templates, facets)
+    _write_facet_index(facets)
+    _write_validation_report(validation)
+
+
+def _shard_of(package: str, shard_count: int) -> int:
+    """Stable shard of a package, independent of Python's hash randomization."""
+    digest = hashlib.sha256(package.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+# weight of the latest run in the recorded stage durations of a plugin
+_COST_SMOOTHING = 0.5
+
+
+class CostModel:
+    """
+    Expected duration (in seconds) of collecting each plugin, per stage (pypi,
+    git, install, extract), smoothed over the runs it was recorded in.
+    """
+
+    def __init__(self, stages: Optional[Dict[str, Dict[str, float]]] = None):
+        self.stages = stages or {}
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> "CostModel":
+        if path is None or not path.exists():
+            return cls()
+        with open(path) as f:
+            costs = json.load(f)
+        # costs of earlier runs were recorded as plain totals
+        return cls(
+            {
+                package: stages
+                if isinstance(stages, dict)
+                else {"total": float(stages)}
+                for package, stages in costs.items()
+            }
+        )
+
+    def save(self, path: Path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.stages, f, indent=2, sort_keys=True)
+
+    def update(self, durations: Dict[str, Dict[str, float]]) -> None:
+        """
+        Record the stage `durations` of a run. Stages that did not occur in the
+        run (e.g. for plugins rendered from stored results) keep their duration.
+        """
+        for package, observed in durations.items():
+            stages = {
+                stage: duration
+                for stage, duration in self.stages.get(package, {}).items()
+                if stage != "total"
+            }
+            for stage, duration in observed.items():
+                stages[stage] = (
+                    _COST_SMOOTHING * duration + (1 - _COST_SMOOTHING) * stages[stage]
+                    if stage in stages
+                    else duration
+                )
+            self.stages[package] = stages
+
+    def costs(self) -> Dict[str, float]:
+        """Return the expected total duration of each recorded plugin."""
+        return {
+            package: sum(stages.values()) for package, stages in self.stages.items()
+        }
+
+
+def plan(packages: List[str], shard_count: int, model: CostModel, top: int = 10) -> str:
+    """
+    Return a report on how `packages` would be distributed over `shard_count`
+    shards given the costs recorded in `model`: the predicted makespan (i.e. the
+    duration of the slowest shard), the load of each shard, and the `top` most
+    expensive plugins with their stages.
+    """
+    costs = model.costs()
+    # as assumed by shard_packages
+    known = sorted(costs.values())
+    default_cost = known[len(known) // 2] if known else 0.0
+    cost = {package: costs.get(package, default_cost) for package in packages}
+    shards = shard_packages(packages, shard_count, costs)
+    loads = [sum(cost[package] for package in shard) for shard in shards]
+    # no schedule can finish before the longest plugin or an even split of all
+    lower_bound = max(max(cost.values(), default=0.0), sum(loads) / shard_count)
+
+    lines = [
+        f"Predicted makespan with {shard_count} shards: {_format_duration(max(loads))} "
+        f"(lower bound {_format_duration(lower_bound)}, "
+        f"total {_format_duration(sum(loads))})"
+    ]
+    for i, (shard, load) in enumerate(zip(shards, loads)):
+        lines.append(f"  shard {i}: {len(shard)} plugins, {_format_duration(load)}")
+    unknown = [package for package in packages if package not in costs]
+    if unknown:
+        lines.append(
+            f"{len(unknown)} plugins without recorded cost, assumed to take "
+            f"{_format_duration(default_cost)} (the median)."
+        )
+    lines.append("Most expensive plugins:")
+    expensive = sorted(
+        (package for package in packages if package in costs),
+        key=lambda package: (-costs[package], package),
+    )
+    for package in expensive[:top]:
+        stages = ", ".join(
+            f"{stage} {_format_duration(duration)}"
+            for stage, duration in sorted(
+                model.stages[package].items(), key=lambda item: -item[1]
+            )
+        )
+        lines.append(f"  {package}: {_format_duration(costs[package])} ({stages})")
+    return "\n".join(lines)
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def shard_packages(
+    packages: List[str],
+    shard_count: int,
+    costs: Optional[Dict[str, float]] = None,
+) -> List[List[str]]:
+    """
+    Deterministically partition `packages` into `shard_count` shards.
+
+    Without `costs`, packages are assigned by a hash of their name. With `costs`
+    (seconds per package from previous runs), packages are assigned longest
+    first to the currently least loaded shard, so that all shards finish at about
+    the same time. Packages without recorded cost are assumed to take the median
+    of the known costs. Within each shard, the input order is kept.
+    """
+    if shard_count < 1:
+        raise ValueError("The number of shards has to be at least 1.")
+    if not costs:
+        assignment = {package: _shard_of(package, shard_count) for package in packages}
+    else:
+        known = sorted(costs.values())
+        default_cost = known[len(known) // 2]
+        loads = [0.0] * shard_count
+        assignment = {}
+        for package in sorted(
+            packages, key=lambda package: (-costs.get(package, default_cost), package)
+        ):
+            shard = min(range(shard_count), key=lambda i: (loads[i], i))
+            assignment[package] = shard
+            loads[shard] += costs.get(package, default_cost)
+
+    shards = [[] for _ in range(shard_count)]
+    for package in packages:
+        shards[assignment[package]].append(package)
+    return shards
+
+
+def collect_shard(
+    shard_index: int,
+    shard_count: int,
+    output: Path,
+    costs_path: Optional[Path] = None,
+    only: Optional[List[str]] = None,
+    options: Optional[RunOptions] = None,
+) -> None:
+    """
+    Collect the plugins of a single shard into `output`, i.e. the plugin pages
+    below `output/plugins/`, a manifest (shard.json) with the collected plugins,
+    the time spent on each of them and the problems found in their pages, and
+    their results below `output/state/`, to be assembled via merge_shards. The
+    shards are made up of all plugins, or those in `only`. All shards of a run
+    have to be given the same `only`, e.g. as listed once by discover, since
+    plugins published in between would otherwise shift the partitioning. The
+    `options` default to RunOptions.from_env.
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Shard index has to be in [0, {shard_count}).")
+    options = options or RunOptions.from_env()
+    packages = discover_plugin_packages(only)
+    shard = shard_packages(packages, shard_count, CostModel.load(costs_path).costs())[
+        shard_index
+    ]
+    print(
+        f"Collecting shard {shard_index + 1}/{shard_count} "
+        f"({len(shard)} of {len(packages)} plugins)",
+        file=sys.stderr,
+    )
+
+    output.mkdir(parents=True, exist_ok=True)
+    durations = {}
+    facets = []
+    validation = {}
+    store = ResultStore(options.state_dir)
+    with _run_deadlines(options.deadlines):
+        _collect(
+            shard,
+            output,
+            durations=durations,
+            store=store,
+            refresh_budget=options.deadlines.refresh,
+            facets=facets,
+            validation=validation,
+            grouped_envs=options.grouped_envs,
+            remote_badges=options.remote_badges,
+        )
+    store.copy_to(ResultStore(output / "state"), shard)
+
+    position = {package: i for i, package in enumerate(packages)}
+    manifest = {
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "packages": packages,
+        "assigned": shard,
+        "plugins": [
+            {
+                "type": entry["type"],
+                "name": entry["name"],
+                "position": position[
+                    f"snakemake-{entry['type']}-plugin-{entry['name']}"
+                ],
+                "facets": entry,
+            }
+            for entry in facets
+        ],
+        "durations": durations,
+        "validation": validation,
+    }
+    with open(output / SHARD_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def merge_shards(
+    shard_dirs: List[Path],
+    base_dir: Path = Path("."),
+    costs_path: Optional[Path] = None,
+    state_dir: Optional[Path] = None,
+) -> None:
+    """
+    Assemble the pages of all shards below `base_dir` and render the index.
+    Plugins keep the order of the PyPI index. If `costs_path` is given, the
+    recorded stage durations are merged into it (see CostModel) for weighting
+    the next run's shards.
+    If `state_dir` is given, the plugin results of the shards are stored there.
+    The shards have to partition the same plugin packages, i.e. each of them has
+    to be assigned to exactly one shard.
+    """
+    manifests = []
+    for shard_dir in shard_dirs:
+        with open(shard_dir / SHARD_MANIFEST) as f:
+            manifests.append((shard_dir, json.load(f)))
+
+    shard_counts = {manifest["shard_count"] for _, manifest in manifests}
+    if len(shard_counts) != 1:
+        raise ValueError("Shards stem from different partitionings.")
+    shard_count = shard_counts.pop()
+    indices = sorted(manifest["shard_index"] for _, manifest in manifests)
+    if indices != list(range(shard_count)):
+        raise ValueError(
+            f"Expected shards 0..{shard_count - 1}, got {', '.join(map(str, indices))}."
+        )
+    packages = [manifest["packages"] for _, manifest in manifests]
+    if any(shard_packages != packages[0] for shard_packages in packages):
+        raise ValueError("Shards stem from different plugin packages.")
+    assigned = Counter(
+        package for _, manifest in manifests for package in manifest["assigned"]
+    )
+    duplicated = sorted(package for package, count in assigned.items() if count > 1)
+    if duplicated:
+        raise ValueError(f"Plugins in multiple shards: {', '.join(duplicated)}.")
+    missing = [package for package in packages[0] if package not in assigned]
+    if missing:
+        raise ValueError(f"Plugins in no shard: {', '.join(missing)}.")
+    if len(assigned) != len(packages[0]):
+        raise ValueError("Shards contain plugins not among their plugin packages.")
+
+    entries = []
+    pages = []
+    durations = {}
+    validation = {}
+    for shard_dir, manifest in manifests:
+        for entry in manifest["plugins"]:
+            page = _page_path(entry["type"], entry["name"])
+            _write_if_changed(base_dir / page, (shard_dir / page).read_text())
+            pages.append(page)
+            entries.append(entry)
+        durations.update(manifest["durations"])
+        validation.update(manifest.get("validation", {}))
+    _prune_pages(base_dir, pages)
+
+    plugins = defaultdict(list)
+    facets = []
+    for entry in sorted(entries, key=lambda entry: entry["position"]):
+        plugins[entry["type"]].append(entry["name"])
+        facets.append(entry["facets"])
+    # plugin types in the order of the collectors, as in collect_plugins
+    type_order = [collector().plugin_type() for collector in COLLECTORS]
+    plugins = {
+        plugin_type: plugins[plugin_type]
+        for plugin_type in type_order
+        if plugin_type in plugins
+    }
+    templates = _get_templates()
+    _write_index(templates, plugins, base_dir)
+    _write_compatibility_table(templates, facets, base_dir)
+    _write_facet_index(facets, base_dir)
+    _write_validation_report(validation, base_dir)
+
+    if state_dir is not None:
+        store = ResultStore(state_dir)
+        for shard_dir, _ in manifests:
+            store.import_from(ResultStore(shard_dir / "state"))
+
+    if costs_path is not None:
+        model = CostModel.load(costs_path)
+        model.update(durations)
+        model.save(costs_path)
+
+
+def _package_list(value: str) -> List[str]:
+    return [package.strip() for package in value.split(",") if package.strip()]
+
+
+def _package_file(value: str) -> List[str]:
+    with open(value) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _run_options(args) -> RunOptions:
+    """RunOptions from the environment, overridden by the given CLI options."""
+    options = RunOptions.from_env()
+    if args.refresh_budget is not None:
+        options.deadlines.refresh = args.refresh_budget
+    return replace(
+        options,
+        **{
+            name: value
+            for name, value in [
+                ("state_dir", args.state),
+                ("grouped_envs", args.grouped_envs),
+                ("remote_badges", args.remote_badges),
+            ]
+            if value is not None
+        },
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Collect Snakemake plugins from PyPI and render catalog pages. "
+        "Has to be run from the source directory of the catalog."
+    )
+    subcommands = parser.add_subparsers(dest="subcommand", required=True)
+
+    # restriction to some plugins, e.g. for testing
+    selection = argparse.ArgumentParser(add_help=False)
+    selected = selection.add_mutually_exclusive_group()
+    selected.add_argument(
+        "--packages",
+        type=_package_list,
+        help="Only consider these plugin packages (separated by ',').",
+    )
+    selected.add_argument(
+        "--package-file",
+        dest="packages",
+        type=_package_file,
+        help="Only consider the plugin packages listed in this file (one per line), "
+        "e.g. as printed by discover.",
+    )
+
+    # options of collection runs, by default from the environment (see RunOptions)
+    run = argparse.ArgumentParser(add_help=False)
+    run.add_argument(
+        "--refresh-budget",
+        type=float,
+        help="Seconds after which no further plugins are refreshed "
+        "(default: CATALOG_DEADLINE_REFRESH, or unlimited).",
+    )
+    run.add_argument(
+        "--state",
+        type=Path,
+        help="Directory with the plugin results of previous runs "
+        "(default: CATALOG_STATE_DIR, or ../.catalog-state).",
+    )
+    run.add_argument(
+        "--grouped-envs",
+        action=argparse.BooleanOptionalAction,
+        help="Install compatible plugins into shared environments "
+        "(default: CATALOG_GROUPED_ENVS).",
+    )
+    run.add_argument(
+        "--remote-badges",
+        action=argparse.BooleanOptionalAction,
+        help="Use shields.io badges instead of inlined ones "
+        "(default: CATALOG_REMOTE_BADGES).",
+    )
+
+    subcommands.add_parser(
+        "discover", parents=[selection], help="List the plugin packages on PyPI."
+    )
+
+    subcommands.add_parser(
+        "collect",
+        parents=[selection, run],
+        help="Collect all plugins and write their pages and the index, to be built "
+        "with CATALOG_PRECOLLECTED=1.",
+    )
+
+    render = subcommands.add_parser(
+        "render",
+        help="Print the page of plugins as collected last, without collecting them.",
+    )
+    render.add_argument("packages", nargs="+", help="Plugin packages.")
+
+    plan_parser = subcommands.add_parser(
+        "plan",
+        parents=[selection],
+        help="Print the predicted duration of collecting all plugins in shards, "
+        "without collecting them.",
+    )
+    plan_parser.add_argument(
+        "--count", type=int, required=True, help="Number of shards."
+    )
+    plan_parser.add_argument(
+        "--costs",
+        type=Path,
+        required=True,
+        help="Per-plugin durations of previous runs (JSON).",
+    )
+    plan_parser.add_argument(
+        "--top", type=int, default=10, help="Number of most expensive plugins to list."
+    )
+
+    shard = subcommands.add_parser(
+        "shard",
+        parents=[selection, run],
+        help="Collect a single shard of all plugins.",
+    )
+    shard.add_argument("--index", type=int, required=True, help="Index of the shard.")
+    shard.add_argument("--count", type=int, required=True, help="Number of shards.")
+    shard.add_argument(
+        "--output", type=Path, required=True, help="Directory for the shard result."
+    )
+    shard.add_argument(
+        "--costs",
+        type=Path,
+        help="Per-plugin durations of previous runs (JSON), for weighting shards.",
+    )
+
+    merge = subcommands.add_parser(
+        "merge", help="Assemble catalog pages and index from all shards."
+    )
+    merge.add_argument("shards", type=Path, nargs="+", help="Shard result dirs.")
+    merge.add_argument(
+        "--costs",
+        type=Path,
+        help="JSON file to update with the per-plugin durations of the shards.",
+    )
+    merge.add_argument(
+        "--state",
+        type=Path,
+        help="Directory in which to store the plugin results of the shards.",
+    )
+
+    args = parser.parse_args(argv)
+    if args.subcommand == "discover":
+        for package in discover_plugin_packages(args.packages):
+            print(package)
+    elif args.subcommand == "collect":
+        collect_plugins(args.packages, _run_options(args))
+    elif args.subcommand == "render":
+        templates = _get_templates()
+        for package in args.packages:
+            try:
+                print(render_page(templates, package))
+            except (ValueError, FileNotFoundError) as e:
+                parser.exit(1, f"Cannot render {package}: {e}\n")
+    elif args.subcommand == "plan":
+        print(
+            plan(
+                discover_plugin_packages(args.packages),
+                args.count,
+                CostModel.load(args.costs),
+                top=args.top,
+            )
+        )
+    elif args.subcommand == "shard":
+        collect_shard(
+            args.index,
+            args.count,
+            args.output,
+            costs_path=args.costs,
+            only=args.packages,
+            options=_run_options(args),
+        )
+    elif args.subcommand == "merge":
+        merge_shards(args.shards, costs_path=args.costs, state_dir=args.state)
 
 
 SECTION_MARK_ORDER = '#*=-^"~:`_+<'
@@ -634,18 +2710,84 @@ class PluginGitInfo:
 
 
 def _get_plugin_git_info(
-    repo_url: str, branches: Optional[List[str]] = None
+    repo_url: str,
+    branches: Optional[List[str]] = None,
+    timeout: Optional[float] = None,
 ) -> PluginGitInfo:
-    """Clone the plugin repo once (bare) and return docs + commit info."""
+    """
+    Clone the plugin repo once (bare) and return docs + commit info.
+    The clone is killed after `timeout` seconds, raising DeadlineExceeded.
+    Within a fetch_scope, plugins sharing a repository share its clone.
+    """
 
     if branches is None:
         branches = ["main", "master"]
+    if timeout is None:
+        timeout = DEADLINES.git
+
+    return _single_flight(
+        ("git", repo_url.rstrip("/").removesuffix(".git"), tuple(branches)),
+        lambda: _clone_plugin_git_info(repo_url, branches, timeout),
+        timeout,
+    )
+
+
+# git clone failures that are worth retrying, like those of PyPI requests
+_GIT_TRANSIENT_RE = re.compile(
+    r"Could not resolve host|Connection (?:reset|refused|timed out)|"
+    r"Operation timed out|remote end hung up|early EOF|RPC failed|"
+    r"returned error: (?:429|5\d\d)",
+    re.IGNORECASE,
+)
+
+
+def _git_clone(repo_url: str, path: str, timeout: float) -> None:
+    """
+    Bare clone `repo_url` into `path`, retrying transient failures (see
+    _retrying). Other failures raise CalledProcessError.
+    """
 
-    for branch in branches:
+    def clone(remaining: float):
+        shutil.rmtree(path, ignore_errors=True)
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                repo = git.Repo.clone_from(repo_url, to_path=tmpdir, bare=True)
+            _run_process(
+                ["git", "clone", "--bare", "--quiet", "--", repo_url, path],
+                timeout=remaining,
+                # never block on a credential prompt for private or moved repos
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            )
+        except subprocess.CalledProcessError as e:
+            output = e.stdout.decode()
+            if _GIT_TRANSIENT_RE.search(output):
+                raise TransientError(output) from e
+            raise
+
+    _retrying(clone, timeout, f"Cloning {repo_url}")
+
 
+def _clone_plugin_git_info(
+    repo_url: str, branches: List[str], timeout: float
+) -> PluginGitInfo:
+    import git
+    import git.exc
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "repo.git")
+        try:
+            _git_clone(repo_url, path, timeout)
+        except subprocess.CalledProcessError as e:
+            print(
+                f"Git error cloning {repo_url}: {e.stdout.decode()}",
+                file=sys.stderr,
+            )
+            return PluginGitInfo(commit=None, docs=PluginDocs(intro=None, further=None))
+        except TransientError as e:
+            print(f"Git error cloning {repo_url}: {e}", file=sys.stderr)
+            return PluginGitInfo(commit=None, docs=PluginDocs(intro=None, further=None))
+        repo = git.Repo(path)
+
+        for branch in branches:
+            try:
                 # commit metadata
                 commit = repo.commit(branch)
                 commit_info = CommitInfo(
@@ -662,21 +2804,206 @@ def _get_plugin_git_info(
 
                 docs = PluginDocs(intro=_show("intro"), further=_show("further"))
                 return PluginGitInfo(commit=commit_info, docs=docs)
-        except git.exc.BadName:
-            print(
-                f"Warning: Branch '{branch}' not found in {repo_url}, trying next branch...",
-                file=sys.stderr,
+            except git.exc.BadName:
+                print(
+                    f"Warning: Branch '{branch}' not found in {repo_url}, trying next branch...",
+                    file=sys.stderr,
+                )
+                continue
+            except git.GitCommandError as e:
+                print(
+                    f"Git error accessing {repo_url} on branch '{branch}': {e}",
+                    file=sys.stderr,
+                )
+                continue
+
+    return PluginGitInfo(commit=None, docs=PluginDocs(intro=None, further=None))
+
+
+_GITHUB_REPO_RE = re.compile(r"https://github\.com/([^/]+)/([^/]+)")
+_GITLAB_REPO_RE = re.compile(r"https://gitlab\.com/(.+)")
+
+_DOCS_SECTIONS = ("intro", "further")
+
+
+class ForgeApi:
+    """
+    Fetch the latest commit and docs of many GitHub and GitLab repositories in a
+    few batched GraphQL queries, instead of cloning each repository.
+    Repositories on other forges, or those that could not be fetched via the API,
+    are cloned as before.
+    """
+
+    def __init__(
+        self,
+        github_token: Optional[str] = None,
+        gitlab_token: Optional[str] = None,
+        github_api_url: str = "https://api.github.com",
+        gitlab_url: str = "https://gitlab.com",
+        batch_size: int = 50,
+    ):
+        self.github_token = github_token
+        self.gitlab_token = gitlab_token
+        self.github_api_url = github_api_url.rstrip("/")
+        self.gitlab_url = gitlab_url.rstrip("/")
+        self.batch_size = batch_size
+        self._git_infos: Dict[str, PluginGitInfo] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["ForgeApi"]:
+        """
+        Return the forge API backend if enabled via `CATALOG_FORGE_API=1`. The
+        GitHub GraphQL API requires a token (`GITHUB_TOKEN`), without it GitHub
+        repositories are cloned. GitLab can be queried anonymously, a token can be
+        given via `GITLAB_TOKEN`.
+        """
+        if not os.environ.get("CATALOG_FORGE_API"):
+            return None
+        return cls(
+            github_token=os.environ.get("GITHUB_TOKEN"),
+            gitlab_token=os.environ.get("GITLAB_TOKEN"),
+        )
+
+    def prefetch(self, repo_urls, timeout: Optional[float] = None) -> None:
+        """Fetch git info of all given repositories in as few requests as possible."""
+        timeout = DEADLINES.git if timeout is None else timeout
+        github = {}
+        gitlab = {}
+        for repo_url in repo_urls:
+            if repo_url in self._git_infos:
+                continue
+            if self.github_token and (match := _GITHUB_REPO_RE.fullmatch(repo_url)):
+                github[repo_url] = match.groups()
+            elif match := _GITLAB_REPO_RE.fullmatch(repo_url):
+                gitlab[repo_url] = match.group(1)
+
+        for batch in _batches(list(github.items()), self.batch_size):
+            self._fetch_github(dict(batch), timeout)
+        for batch in _batches(list(gitlab.items()), self.batch_size):
+            self._fetch_gitlab(dict(batch), timeout)
+
+    def get_plugin_git_info(
+        self, repo_url: str, timeout: Optional[float] = None
+    ) -> PluginGitInfo:
+        """Return prefetched git info, falling back to cloning the repository."""
+        try:
+            return self._git_infos[repo_url]
+        except KeyError:
+            return _get_plugin_git_info(repo_url, timeout=timeout)
+
+    def _graphql(self, url, query, token, timeout) -> Dict[str, Any]:
+        import requests
+
+        headers = {
+            "User-Agent": "Snakemake plugin catalog (https://github.com/snakemake/snakemake-plugin-catalog)"
+        }
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            res = requests.post(
+                url, json={"query": query}, headers=headers, timeout=timeout
             )
-            continue
-        except git.GitCommandError as e:
-            # Clone failures or other git errors
+            if res.status_code != 200:
+                raise MetadataError(
+                    f"GraphQL request to {url} failed with status {res.status_code}"
+                )
+            result = res.json()
+        except (requests.RequestException, MetadataError) as e:
             print(
-                f"Git error accessing {repo_url} on branch '{branch}': {e}",
+                f"Warning: {e}, falling back to cloning repositories.",
                 file=sys.stderr,
             )
-            continue
+            return {}
+        for error in result.get("errors") or []:
+            # e.g. a repository that does not exist (anymore), which is then
+            # handled by the clone fallback
+            print(f"Warning: {url}: {error.get('message')}", file=sys.stderr)
+        return result.get("data") or {}
+
+    def _fetch_github(self, repos: Dict[str, tuple], timeout: float) -> None:
+        aliases = {}
+        fields = []
+        for i, (repo_url, (owner, name)) in enumerate(repos.items()):
+            alias = f"r{i}"
+            aliases[alias] = repo_url
+            docs = " ".join(
+                f'{section}: object(expression: "HEAD:docs/{section}.md") '
+                "{ ... on Blob { text } }"
+                for section in _DOCS_SECTIONS
+            )
+            fields.append(
+                f"{alias}: repository(owner: {json.dumps(owner)}, "
+                f"name: {json.dumps(name)}) {{ "
+                "defaultBranchRef { target { ... on Commit { oid committedDate } } } "
+                f"{docs} }}"
+            )
+        query = "query { " + " ".join(fields) + " }"
+        data = self._graphql(
+            f"{self.github_api_url}/graphql", query, self.github_token, timeout
+        )
+        for alias, repo_url in aliases.items():
+            repo = data.get(alias)
+            if not repo:
+                continue
+            target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+            commit = (
+                CommitInfo(sha=target["oid"][:7], date=target["committedDate"])
+                if target.get("oid")
+                else None
+            )
+            docs = PluginDocs(
+                **{
+                    section: (repo.get(section) or {}).get("text")
+                    for section in _DOCS_SECTIONS
+                }
+            )
+            self._git_infos[repo_url] = PluginGitInfo(commit=commit, docs=docs)
+
+    def _fetch_gitlab(self, repos: Dict[str, str], timeout: float) -> None:
+        paths = [f"docs/{section}.md" for section in _DOCS_SECTIONS]
+        query = (
+            f"query {{ projects(fullPaths: {json.dumps(list(repos.values()))}, "
+            f"first: {len(repos)}) {{ nodes {{ fullPath repository {{ "
+            "tree { lastCommit { sha committedDate } } "
+            f"blobs(paths: {json.dumps(paths)}) {{ nodes {{ path rawTextBlob }} }} "
+            "} } } }"
+        )
+        data = self._graphql(
+            f"{self.gitlab_url}/api/graphql", query, self.gitlab_token, timeout
+        )
+        projects = {
+            project["fullPath"].lower(): project
+            for project in ((data.get("projects") or {}).get("nodes") or [])
+        }
+        for repo_url, full_path in repos.items():
+            project = projects.get(full_path.lower())
+            if not project or not project.get("repository"):
+                continue
+            repo = project["repository"]
+            last_commit = (repo.get("tree") or {}).get("lastCommit")
+            commit = (
+                CommitInfo(
+                    sha=last_commit["sha"][:7], date=last_commit["committedDate"]
+                )
+                if last_commit
+                else None
+            )
+            blobs = {
+                blob["path"]: blob.get("rawTextBlob")
+                for blob in ((repo.get("blobs") or {}).get("nodes") or [])
+            }
+            docs = PluginDocs(
+                **{
+                    section: blobs.get(f"docs/{section}.md")
+                    for section in _DOCS_SECTIONS
+                }
+            )
+            self._git_infos[repo_url] = PluginGitInfo(commit=commit, docs=docs)
 
-    return PluginGitInfo(commit=None, docs=PluginDocs(intro=None, further=None))
+
+def _batches(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
 
 
 def _convert_markdown_to_rst(
@@ -695,6 +3022,8 @@ def _convert_markdown_to_rst(
     if markdown_content is None:
         return None
 
+    import m2r2
+
     renderer = m2r2.RestRenderer()
     renderer.hmarks = {
         i + 1: mark
@@ -703,3 +3032,7 @@ def _convert_markdown_to_rst(
         )
     }
     return m2r2.convert(markdown_content, renderer=renderer)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,16 @@
 # -- Project information -----------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#project-information
 
+import os
 import sys
 from sphinxawesome_theme.postprocess import Icons
 
 sys.path.insert(0, ".")
 from collect_plugins import collect_plugins
 
-collect_plugins()
+# pages may already have been assembled from shards (see collect_plugins.py merge)
+if not os.environ.get("CATALOG_PRECOLLECTED"):
+    collect_plugins()
 
 project = "Snakemake plugin catalog"
 copyright = "2023, The Snakemake team"
@@ -21,10 +24,11 @@ author = "Johannes Köster"
 # -- General configuration ---------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#general-configuration
 
-extensions = []
+# renders the plugin pages written by collect_plugins
+extensions = ["plugin_pages"]
 
 templates_path = ["_templates"]
-exclude_patterns = []
+exclude_patterns = ["_extra"]
 
 
 # -- Options for HTML output -------------------------------------------------
@@ -32,6 +36,8 @@ exclude_patterns = []
 
 html_theme = "sphinxawesome_theme"
 html_static_path = ["_static"]
+# faceted search index of the plugins, see collect_plugins._write_facet_index
+html_extra_path = ["_extra"]
 html_css_files = ["custom.css"]
 html_theme_options = {
     "logo_light": "_static/logo-snake.svg",
@@ -0,0 +1,68 @@
+"""Helpers shared by the unit tests."""
+
+from contextlib import contextmanager
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+from collect_plugins import PluginRecord
+
+
+def plugin_record(name, version="1.0", summary=None, authors=(), license=None):
+    return PluginRecord(
+        name=name,
+        version=version,
+        summary=summary,
+        description="",
+        authors=list(authors),
+        project_urls={},
+        requires_dist=[],
+        license=license,
+    )
+
+
+def plugin_context(
+    package, version="1.0", error=None, summary=None, authors=(), license=None
+):
+    """Return the render context of an executor plugin, as by collect_plugin."""
+    return {
+        "plugin_name": package.removeprefix("snakemake-executor-plugin-"),
+        "package_name": package,
+        "authors": list(authors),
+        "repository": None,
+        "repo_shortname": None,
+        "repository_type": None,
+        "commit_info": None,
+        "commit_url": None,
+        "snakemake_version": None,
+        "record": asdict(plugin_record(package, version, summary, authors, license)),
+        "docs_intro": None,
+        "docs_further": None,
+        "docs_warning": "",
+        "plugin_type": "executor",
+        "settings": [],
+        "error": error,
+        "timed_out": False,
+    }
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Request handler that does not log requests."""
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def serve_http(handler):
+    """Serve requests with `handler` in a thread, yielding the base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
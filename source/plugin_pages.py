@@ -0,0 +1,102 @@
+"""
+Sphinx extension that renders the plugin pages of the catalog from the data
+written by collect_plugins.py (plugins/<type>/<name>.json, see _write_page).
+
+Sphinx reads these files as documents and this extension replaces their
+content with the rendered page. Besides the modification time of the page data,
+which only changes along with the data, a page is considered outdated if its
+rendering changed (e.g. because of template changes or the age of the last
+commit), such that an incremental build only reads the pages that differ.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict
+
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+
+from collect_plugins import PAGE_SUFFIX, _get_templates, render_plugin
+
+
+def _is_plugin_page(docname: str) -> bool:
+    return docname.startswith("plugins/")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class PluginPages:
+    """Rendered plugin pages of a build, by docname."""
+
+    def __init__(self, srcdir: Path):
+        self.srcdir = srcdir
+        self.templates = _get_templates(srcdir / "_templates")
+        self._rendered: Dict[str, str] = {}
+
+    def render(self, docname: str, data: str) -> str:
+        if docname not in self._rendered:
+            page = json.loads(data)
+            self._rendered[docname] = render_plugin(
+                self.templates,
+                page["context"],
+                page["last_refreshed"],
+                page.get("remote_badges", False),
+            )
+        return self._rendered[docname]
+
+    def render_file(self, docname: str) -> str:
+        with open(self.srcdir / f"{docname}{PAGE_SUFFIX}") as f:
+            return self.render(docname, f.read())
+
+
+def builder_inited(app: Sphinx) -> None:
+    app.plugin_pages = PluginPages(Path(app.srcdir))
+    if not hasattr(app.env, "plugin_page_digests"):
+        app.env.plugin_page_digests = {}
+
+
+def env_get_outdated(app: Sphinx, env: BuildEnvironment, added, changed, removed):
+    # pages are rendered here, before reading (and forking the parallel readers),
+    # such that each page is rendered only once
+    return [
+        docname
+        for docname in env.found_docs - added - changed - removed
+        if _is_plugin_page(docname)
+        and env.plugin_page_digests.get(docname)
+        != _digest(app.plugin_pages.render_file(docname))
+    ]
+
+
+def source_read(app: Sphinx, docname: str, source) -> None:
+    if _is_plugin_page(docname):
+        source[0] = app.plugin_pages.render(docname, source[0])
+        app.env.plugin_page_digests[docname] = _digest(source[0])
+
+
+def env_purge_doc(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    env.plugin_page_digests.pop(docname, None)
+
+
+def env_merge_info(app: Sphinx, env: BuildEnvironment, docnames, other) -> None:
+    # digests recorded by the parallel readers
+    for docname in docnames:
+        if docname in other.plugin_page_digests:
+            env.plugin_page_digests[docname] = other.plugin_page_digests[docname]
+
+
+def setup(app: Sphinx):
+    app.add_source_suffix(PAGE_SUFFIX, "restructuredtext")
+    app.connect("builder-inited", builder_inited)
+    app.connect("env-get-outdated", env_get_outdated)
+    app.connect("source-read", source_read)
+    app.connect("env-purge-doc", env_purge_doc)
+    app.connect("env-merge-info", env_merge_info)
+    return {
+        "version": "1.0",
+        "env_version": 1,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
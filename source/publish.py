@@ -0,0 +1,257 @@
+"""
+Post-processing of the built catalog for publishing. Static assets get content
+fingerprinted names, with the references in pages and stylesheets rewritten and
+a manifest of all renamings (asset-manifest.json), such that they can be cached
+indefinitely. Text files are precompressed with gzip and, if available, brotli,
+such that they can be served compressed without compressing on each request.
+Precompression only pays off on hosts that serve these variants (GitHub Pages
+does not), hence it can be disabled via --no-compress.
+
+Usage (from the repository root): python source/publish.py build public
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import hashlib
+import json
+import posixpath
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    import brotli
+except ImportError:
+    # only gzip variants are written
+    brotli = None
+
+# directories of the build with static assets, which are fingerprinted
+ASSET_DIRS = ("_static", "_images")
+MANIFEST = "asset-manifest.json"
+
+# files referring to assets via relative URLs, which are rewritten
+_REFERRING_SUFFIXES = {".html", ".css"}
+# objects.inv and images are already compressed
+_COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+# below this size, the overhead of compressed responses outweighs the savings
+_MIN_COMPRESS_SIZE = 512
+
+_URL_RE = re.compile(
+    r"""(?P<prefix>(?:src|href)=["']|url\(\s*["']?|@import\s+["'])"""
+    r"""(?P<url>[^"'()\s?#]+)"""
+)
+
+
+def _resolve(url: str, path: str) -> Optional[str]:
+    """Return the file `url` refers to from file `path` (both relative to the root)."""
+    if ":" in url or url.startswith("/"):
+        # absolute URLs, data URIs and the like
+        return None
+    return posixpath.normpath(posixpath.join(posixpath.dirname(path), url))
+
+
+def _references(text: str, path: str, assets: Set[str]) -> Set[str]:
+    return {
+        target
+        for match in _URL_RE.finditer(text)
+        if (target := _resolve(match.group("url"), path)) in assets
+    }
+
+
+def _rewrite(text: str, path: str, names: Dict[str, str]) -> str:
+    """Replace the references to assets in `text` of file `path` by their `names`."""
+
+    def replace(match):
+        url = match.group("url")
+        target = _resolve(url, path)
+        if target not in names:
+            return match.group(0)
+        return match.group("prefix") + posixpath.join(
+            posixpath.dirname(url), posixpath.basename(names[target])
+        )
+
+    return _URL_RE.sub(replace, text)
+
+
+def _fingerprinted(path: str, data: bytes) -> str:
+    stem, suffix = posixpath.splitext(path)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:8]}{suffix}"
+
+
+def fingerprint_assets(root: Path) -> Dict[str, str]:
+    """
+    Write a content fingerprinted copy of each asset below `root` and return the
+    mapping of asset paths to the paths of their copies (relative to `root`).
+    Stylesheets are fingerprinted after the assets they refer to, with these
+    references rewritten, such that their names change along with them. The
+    original assets are kept for references that cannot be rewritten (e.g. those
+    composed by scripts), see _unreferenced.
+    """
+    assets = {
+        path.relative_to(root).as_posix()
+        for asset_dir in ASSET_DIRS
+        if (root / asset_dir).is_dir()
+        for path in (root / asset_dir).rglob("*")
+        if path.is_file()
+    }
+    names = {}
+
+    def fingerprint(asset: str, visiting: Set[str]):
+        if asset in names:
+            return
+        path = root / asset
+        data = path.read_bytes()
+        if path.suffix in _REFERRING_SUFFIXES:
+            text = data.decode()
+            visiting.add(asset)
+            # references in cycles are left as is
+            for target in sorted(_references(text, asset, assets) - visiting):
+                fingerprint(target, visiting)
+            visiting.discard(asset)
+            data = _rewrite(text, asset, names).encode()
+            path.write_bytes(data)
+        names[asset] = _fingerprinted(asset, data)
+        (root / names[asset]).write_bytes(data)
+
+    for asset in sorted(assets):
+        fingerprint(asset, set())
+    return names
+
+
+# asset names of the worker processes, see _init_worker
+_NAMES: Dict[str, str] = {}
+
+
+def _init_worker(names: Dict[str, str]) -> None:
+    global _NAMES
+    _NAMES = names
+
+
+def _rewrite_file(root: str, path: str, rewrite: bool) -> Set[str]:
+    """
+    Rewrite the asset references of file `path` (if `rewrite`). Return the
+    assets whose original name is still mentioned in the file, such as those
+    composed by scripts.
+    """
+    file = Path(root) / path
+    if file.suffix not in _COMPRESSIBLE_SUFFIXES:
+        return set()
+    text = file.read_bytes().decode(errors="replace")
+    if rewrite:
+        text = _rewrite(text, path, _NAMES)
+        file.write_bytes(text.encode())
+    return {asset for asset in _NAMES if posixpath.basename(asset) in text}
+
+
+def _compress_file(root: str, path: str) -> Tuple[int, int, int]:
+    """
+    Write the compressed variants of file `path`. Return the size of the file and
+    of its gzip and brotli variants (the file size where there is none).
+    """
+    file = Path(root) / path
+    data = file.read_bytes()
+    sizes = [len(data), len(data), len(data)]
+    if file.suffix not in _COMPRESSIBLE_SUFFIXES or len(data) < _MIN_COMPRESS_SIZE:
+        return tuple(sizes)
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(data, quality=11)))
+    for i, (suffix, compressed) in enumerate(variants, start=1):
+        if len(compressed) < len(data):
+            file.with_name(file.name + suffix).write_bytes(compressed)
+            sizes[i] = len(compressed)
+    return tuple(sizes)
+
+
+def publish(
+    build_dir: Path,
+    output_dir: Path,
+    workers: Optional[int] = None,
+    compress: bool = True,
+) -> Dict[str, str]:
+    """
+    Copy the built site from `build_dir` to `output_dir` (replacing it), with
+    fingerprinted assets, rewritten pages and (if `compress`) precompressed
+    files. Original assets that nothing refers to anymore are removed. Pages are
+    processed by `workers` processes (by default one per CPU). Return the
+    manifest of fingerprinted assets, which is also written to `output_dir`.
+    """
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    shutil.copytree(build_dir, output_dir)
+    names = fingerprint_assets(output_dir)
+
+    files = sorted(
+        path.relative_to(output_dir).as_posix()
+        for path in output_dir.rglob("*")
+        if path.is_file()
+    )
+    # assets were already rewritten when fingerprinting them
+    rewrite = [
+        Path(path).suffix == ".html" and path.split("/", 1)[0] not in ASSET_DIRS
+        for path in files
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(names,)
+    ) as pool:
+        mentioned = set().union(
+            *pool.map(
+                _rewrite_file,
+                [str(output_dir)] * len(files),
+                files,
+                rewrite,
+                chunksize=16,
+            )
+        )
+        for asset in set(names) - mentioned:
+            (output_dir / asset).unlink()
+        files = [path for path in files if path in mentioned or path not in names]
+        if compress:
+            sizes = list(
+                pool.map(
+                    _compress_file, [str(output_dir)] * len(files), files, chunksize=16
+                )
+            )
+        else:
+            sizes = [((output_dir / path).stat().st_size,) * 3 for path in files]
+
+    with open(output_dir / MANIFEST, "w") as f:
+        json.dump(names, f, indent=2, sort_keys=True)
+
+    total, gzipped, brotlied = (sum(column) for column in zip(*sizes))
+    print(
+        f"Published {len(files)} files ({len(names)} assets fingerprinted), "
+        f"{total} bytes"
+        + (f", {gzipped} gzip" if compress else "")
+        + (f", {brotlied} brotli" if compress and brotli is not None else "")
+        + ".",
+        file=sys.stderr,
+    )
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prepare the built catalog for publishing, with fingerprinted "
+        "assets and precompressed files."
+    )
+    parser.add_argument("build", type=Path, help="Directory of the built site.")
+    parser.add_argument("output", type=Path, help="Directory to publish from.")
+    parser.add_argument(
+        "--jobs", type=int, help="Number of worker processes (default: one per CPU)."
+    )
+    parser.add_argument(
+        "--no-compress",
+        dest="compress",
+        action="store_false",
+        help="Do not precompress files, e.g. for hosts that do not serve them.",
+    )
+    args = parser.parse_args(argv)
+    publish(args.build, args.output, workers=args.jobs, compress=args.compress)
+
+
+if __name__ == "__main__":
+    main()
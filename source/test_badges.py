@@ -0,0 +1,36 @@
+from xml.etree import ElementTree
+
+from badges import Badge, _text_width
+
+
+def test_badge_svg():
+    """Test a badge is rendered as well-formed SVG sized to its text."""
+    badge = Badge("pypi", "v1.0", "#047857")
+    svg = ElementTree.fromstring(badge.svg())
+    ns = {"svg": "http://www.w3.org/2000/svg"}
+    texts = [text.text for text in svg.findall(".//svg:text", ns)]
+    assert texts == ["pypi", "v1.0"]
+    assert int(svg.get("width")) == _text_width("pypi") + _text_width("v1.0") + 24
+    assert svg.find("svg:rect", ns).get("fill") == "#047857"
+
+
+def test_badge_escapes_text():
+    """Test badge texts and targets are escaped."""
+    badge = Badge("author", "A <B> & C", "%2316a34a", 'https://x.org/"y"')
+    html = badge.html()
+    assert "A &lt;B&gt; &amp; C" in html
+    assert 'href="https://x.org/&quot;y&quot;"' in html
+    # shields.io style URL encoded colors are accepted
+    assert 'fill="#16a34a"' in html
+    ElementTree.fromstring(badge.svg())
+
+
+def test_badge_without_target():
+    """Test badges without target are not linked."""
+    assert Badge("license", "MIT", "#10b981").html().startswith("<svg")
+
+
+def test_text_width_monotonic():
+    """Test wider text yields wider badges."""
+    assert _text_width("ill") < _text_width("www")
+    assert _text_width("") == 0
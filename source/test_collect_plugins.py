@@ -1,12 +1,57 @@
 """Unit tests for collect_plugins."""
 
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
 from packaging.version import Version
 
+import collect_plugins
+from conftest import QuietHandler, plugin_context, plugin_record, serve_http
 from collect_plugins import (
+    Budget,
+    CompatibilityMatrix,
+    CostModel,
+    ForgeApi,
+    MetadataError,
+    PluginCollectorBase,
+    PluginRecord,
+    ResultStore,
+    RunOptions,
+    SingleFlight,
+    Deadlines,
+    DeadlineExceeded,
+    ExecutorPluginCollector,
+    GroupMetadataCollector,
+    StoragePluginCollector,
+    _collect_group_metadata,
     _convert_markdown_to_rst,
+    _get_plugin_git_info,
+    _hedged,
     _plugin_min_snakemake,
+    _PypiInfoParser,
+    _collect,
     _commit_url,
+    _get_templates,
+    _plugin_facets,
+    _write_facet_index,
+    _validate_pages,
+    fetch_scope,
+    pypi_api,
+    _refresh_priority,
+    _run_process,
     get_repo_shortname,
+    group_plugins,
+    merge_shards,
+    plan,
+    render_page,
+    render_plugin,
+    shard_packages,
 )
 
 
@@ -229,6 +274,72 @@ def test_plugin_min_snakemake_edge_case_at_upper_bound():
     assert result is None
 
 
+def _executor_release(version, lower, upper):
+    return (
+        Version(version),
+        "snakemake-interface-executor-plugins",
+        Version(lower),
+        Version(upper),
+    )
+
+
+def test_compatibility_matrix():
+    """Test the compatibility of all plugins with all releases is computed at once."""
+    compat_index = [
+        _executor_release("8.0.0", "1.0", "2.0"),
+        (
+            Version("8.0.0"),
+            "snakemake-interface-storage-plugins",
+            Version("3.0"),
+            Version("4.0"),
+        ),
+        _executor_release("8.5.0", "2.0", "3.0"),
+        (
+            Version("8.5.0"),
+            "snakemake-interface-storage-plugins",
+            Version("3.0"),
+            Version("4.0"),
+        ),
+        _executor_release("9.0.0", "1.5", "3.0"),
+    ]
+    compatibility = CompatibilityMatrix(
+        {
+            "old": ["snakemake-interface-executor-plugins (>=1.5)"],
+            "new": ["snakemake-interface-executor-plugins>=2.1,<3"],
+            "storage": ["snakemake-interface-storage-plugins (>=3.2)"],
+            "both": [
+                "snakemake-interface-executor-plugins (>=1.0)",
+                "snakemake-interface-storage-plugins (>=3.0)",
+            ],
+            "none": ["requests (>=2.0)"],
+        },
+        compat_index,
+    )
+
+    assert compatibility.matrix.tolist() == [
+        [True, False, True, True, False],
+        [False, True, True, False, False],
+        [True, True, False, False, False],
+    ]
+    assert compatibility.min_snakemake("old") == ">=8.0"
+    assert compatibility.min_snakemake("new") == ">=8.5"
+    assert compatibility.min_snakemake("none") is None
+    assert compatibility.ranges("old") == [["8.0.0", "8.5.0"], ["9.0.0", None]]
+    assert compatibility.ranges("new") == [["8.5.0", None]]
+    assert compatibility.ranges("storage") == [["8.0.0", "9.0.0"]]
+    assert compatibility.ranges("both") == [["8.0.0", "8.5.0"]]
+    assert compatibility.ranges("none") == []
+
+
+def test_compatibility_matrix_empty_index():
+    """Test plugins are incompatible without known Snakemake releases."""
+    compatibility = CompatibilityMatrix(
+        {"a": ["snakemake-interface-executor-plugins (>=1.0)"]}, []
+    )
+    assert compatibility.min_snakemake("a") is None
+    assert compatibility.ranges("a") == []
+
+
 # Commit URL construction tests
 
 
@@ -293,3 +404,1290 @@ def test_get_repo_shortname_other_domain():
     """Test URL from other domain remains unchanged."""
     shortname = get_repo_shortname("https://bitbucket.org/user/repo")
     assert shortname == "https://bitbucket.org/user/repo"
+
+
+# Deadline tests
+
+
+def test_deadlines_from_env(monkeypatch):
+    """Test stage deadlines can be overridden via environment variables."""
+    monkeypatch.setenv("CATALOG_DEADLINE_GIT", "12.5")
+    monkeypatch.setenv("CATALOG_DEADLINE_RETRIES", "7")
+    deadlines = Deadlines.from_env()
+    assert deadlines.git == 12.5
+    assert deadlines.retries == 7
+    assert deadlines.pypi == Deadlines.pypi
+
+
+@pytest.mark.parametrize("subcommand", ["collect", "shard"])
+def test_main_run_options(monkeypatch, subcommand):
+    """Test run options are read from the environment when the command runs."""
+    runs = []
+    monkeypatch.setattr(
+        collect_plugins,
+        "collect_plugins",
+        lambda only, options: runs.append(options),
+    )
+    monkeypatch.setattr(
+        collect_plugins,
+        "collect_shard",
+        lambda *args, options, **kwargs: runs.append(options),
+    )
+    args = [subcommand]
+    if subcommand == "shard":
+        args += ["--index", "0", "--count", "1", "--output", "out"]
+    monkeypatch.setenv("CATALOG_DEADLINE_REFRESH", "60")
+    monkeypatch.setenv("CATALOG_DEADLINE_GIT", "12")
+    monkeypatch.setenv("CATALOG_GROUPED_ENVS", "1")
+    collect_plugins.main(args)
+    collect_plugins.main(
+        args
+        + [
+            "--refresh-budget",
+            "30",
+            "--state",
+            "state",
+            "--no-grouped-envs",
+            "--remote-badges",
+        ]
+    )
+
+    assert runs[0] == RunOptions(
+        deadlines=Deadlines(refresh=60, git=12), grouped_envs=True
+    )
+    assert runs[1] == RunOptions(
+        deadlines=Deadlines(refresh=30, git=12),
+        state_dir=Path("state"),
+        remote_badges=True,
+    )
+
+
+def test_budget_caps_stage_timeout():
+    """Test the stage timeout is capped by the remaining budget."""
+    budget = Budget(10)
+    assert budget.timeout(5) == 5
+    assert 9 < budget.timeout(60) <= 10
+
+
+def test_budget_exhausted():
+    """Test an exhausted budget raises DeadlineExceeded."""
+    budget = Budget(0)
+    with pytest.raises(DeadlineExceeded):
+        budget.timeout(5)
+
+
+def test_run_process_timeout():
+    """Test a hanging command is killed after its timeout."""
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        _run_process(["sh", "-c", "sleep 10 & sleep 10"], timeout=0.2)
+    assert time.monotonic() - start < 5
+
+
+def test_run_process_failure():
+    """Test a failing command raises CalledProcessError with its output."""
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        _run_process(["sh", "-c", "echo broken; exit 3"], timeout=5)
+    assert e.value.returncode == 3
+    assert e.value.stdout.decode().strip() == "broken"
+
+
+def test_hedged_second_attempt_wins():
+    """Test a slow first attempt is hedged by a second one."""
+    calls = []
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            calls.append(None)
+            attempt = len(calls)
+        if attempt == 1:
+            time.sleep(2)
+            return "slow"
+        return "fast"
+
+    assert _hedged(fetch, hedge_after=0.05, timeout=1) == "fast"
+
+
+def test_hedged_timeout():
+    """Test hedged requests give up after the timeout."""
+    with pytest.raises(DeadlineExceeded):
+        _hedged(lambda: time.sleep(1), hedge_after=0.05, timeout=0.2)
+
+
+# Git info tests
+
+
+def _make_repo(path, files):
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    for name, content in files.items():
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text(content)
+    subprocess.run(["git", "-C", str(path), "add", "."], check=True)
+    subprocess.run(
+        [
+            "git",
+            "-C",
+            str(path),
+            "-c",
+            "user.name=test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            "init",
+        ],
+        check=True,
+    )
+
+
+def test_get_plugin_git_info_local_repo(tmp_path):
+    """Test commit info and docs are read from a single clone."""
+    _make_repo(tmp_path / "repo", {"docs/intro.md": "Intro text"})
+    info = _get_plugin_git_info(str(tmp_path / "repo"), timeout=30)
+    assert info.commit is not None
+    assert len(info.commit.sha) == 7
+    assert info.docs.intro == "Intro text"
+    assert info.docs.further is None
+
+
+def test_get_plugin_git_info_missing_repo(tmp_path, monkeypatch):
+    """Test a failing clone yields empty git info, without retrying it."""
+    clones = []
+    run_process = collect_plugins._run_process
+
+    def counting_run_process(cmd, **kwargs):
+        clones.append(cmd)
+        return run_process(cmd, **kwargs)
+
+    monkeypatch.setattr(collect_plugins, "_run_process", counting_run_process)
+    info = _get_plugin_git_info(str(tmp_path / "missing"), timeout=30)
+    assert info.commit is None
+    assert info.docs.intro is None
+    assert len(clones) == 1
+
+
+def test_get_plugin_git_info_retries_transient_failure(tmp_path, monkeypatch):
+    """Test clones are retried like PyPI requests if the failure is transient."""
+    _make_repo(tmp_path / "repo", {"docs/intro.md": "Intro text"})
+    monkeypatch.setattr(collect_plugins, "DEADLINES", Deadlines(backoff=0))
+    clones = []
+    run_process = collect_plugins._run_process
+
+    def flaky_run_process(cmd, **kwargs):
+        clones.append(cmd)
+        if len(clones) == 1:
+            # leave a partial clone behind
+            Path(cmd[-1]).mkdir()
+            raise subprocess.CalledProcessError(
+                128, cmd, output=b"fatal: the remote end hung up unexpectedly"
+            )
+        return run_process(cmd, **kwargs)
+
+    monkeypatch.setattr(collect_plugins, "_run_process", flaky_run_process)
+    info = _get_plugin_git_info(str(tmp_path / "repo"), timeout=30)
+    assert len(clones) == 2
+    assert info.docs.intro == "Intro text"
+
+
+# Single-flight tests
+
+
+def test_single_flight_shares_concurrent_fetch():
+    """Test overlapping calls with the same key share a single fetch."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    follower.start()
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == ["result", "result"]
+    assert len(calls) == 1
+    # results are kept for later calls
+    assert flight.do("k", fetch) == "result"
+    assert len(calls) == 1
+
+
+def test_single_flight_failure_not_kept():
+    """Test a failed fetch is retried by later calls."""
+    flight = SingleFlight()
+
+    def fail():
+        raise MetadataError("failed")
+
+    with pytest.raises(MetadataError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "result") == "result"
+
+
+def test_single_flight_wait_timeout():
+    """Test waiting for another caller's fetch is bounded."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+
+    leader = threading.Thread(target=lambda: flight.do("k", fetch))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(DeadlineExceeded):
+        flight.do("k", fetch, timeout=0.01)
+    release.set()
+    leader.join()
+
+
+def test_fetch_scope_git_info_cloned_once(tmp_path, monkeypatch):
+    """Test plugins sharing a repository share its clone within a run."""
+    _make_repo(tmp_path / "repo", {"docs/intro.md": "Intro text"})
+    clones = []
+    run_process = collect_plugins._run_process
+
+    def counting_run_process(cmd, **kwargs):
+        clones.append(cmd)
+        return run_process(cmd, **kwargs)
+
+    monkeypatch.setattr(collect_plugins, "_run_process", counting_run_process)
+    repo_url = str(tmp_path / "repo")
+    with fetch_scope():
+        first = _get_plugin_git_info(repo_url, timeout=30)
+        second = _get_plugin_git_info(repo_url + "/", timeout=30)
+    assert first is second
+    assert len(clones) == 1
+
+    # outside of a run, nothing is shared
+    _get_plugin_git_info(repo_url, timeout=30)
+    assert len(clones) == 2
+
+
+def test_fetch_scope_pypi_queried_once(monkeypatch):
+    """Test repeated PyPI queries within a run are only sent once."""
+    queries = []
+
+    def pypi_request(query, accept, timeout, parse):
+        queries.append(query)
+        return {"query": query}
+
+    monkeypatch.setattr(collect_plugins, "_pypi_request", pypi_request)
+    with fetch_scope():
+        assert pypi_api("https://pypi.org/pypi/a/json") == {
+            "query": "https://pypi.org/pypi/a/json"
+        }
+        pypi_api("https://pypi.org/pypi/a/json")
+        pypi_api("https://pypi.org/pypi/b/json")
+    assert queries == ["https://pypi.org/pypi/a/json", "https://pypi.org/pypi/b/json"]
+
+
+# Sharding tests
+
+
+PACKAGES = [f"snakemake-executor-plugin-{i}" for i in range(20)]
+
+
+def test_shard_packages_partition():
+    """Test every package ends up in exactly one shard, keeping the order."""
+    shards = shard_packages(PACKAGES, 3)
+    assert len(shards) == 3
+    assert sorted(p for shard in shards for p in shard) == sorted(PACKAGES)
+    for shard in shards:
+        assert shard == [p for p in PACKAGES if p in shard]
+
+
+def test_shard_packages_deterministic():
+    """Test the partitioning does not depend on the input order."""
+    shards = shard_packages(PACKAGES, 4)
+    reversed_shards = shard_packages(PACKAGES[::-1], 4)
+    assert [set(shard) for shard in shards] == [set(s) for s in reversed_shards]
+
+
+def test_shard_packages_weighted_by_cost():
+    """Test expensive packages are spread over the shards."""
+    costs = {package: 1.0 for package in PACKAGES}
+    costs[PACKAGES[0]] = 100.0
+    costs[PACKAGES[1]] = 100.0
+    shards = shard_packages(PACKAGES, 2, costs)
+    assert PACKAGES[0] in shards[0]
+    assert PACKAGES[1] in shards[1]
+    loads = [sum(costs[p] for p in shard) for shard in shards]
+    assert abs(loads[0] - loads[1]) <= 1.0
+
+
+def test_shard_packages_invalid_count():
+    """Test at least one shard is required."""
+    with pytest.raises(ValueError):
+        shard_packages(PACKAGES, 0)
+
+
+def test_cost_model_smoothed_stages(tmp_path):
+    """Test stage durations are smoothed over runs, also from plain totals."""
+    path = tmp_path / "costs.json"
+    path.write_text(json.dumps({"a": 10.0, "b": {"pypi": 1.0, "install": 8.0}}))
+    model = CostModel.load(path)
+    assert model.costs() == {"a": 10.0, "b": 9.0}
+
+    model.update({"a": {"pypi": 1.0, "install": 3.0}, "b": {"install": 4.0}})
+    model.save(path)
+
+    assert CostModel.load(path).stages == {
+        "a": {"pypi": 1.0, "install": 3.0},
+        "b": {"pypi": 1.0, "install": 6.0},
+    }
+
+
+def test_plan_predicts_makespan():
+    """Test the plan reports the slowest shard and the most expensive plugins."""
+    model = CostModel(
+        {
+            "a": {"install": 3600.0, "extract": 60.0},
+            "b": {"install": 1800.0},
+            "c": {"pypi": 1200.0},
+        }
+    )
+    report = plan(["a", "b", "c", "d"], 2, model, top=2).splitlines()
+    # d is assumed to take the median (30m), and is placed along with b and c
+    assert report[0] == (
+        "Predicted makespan with 2 shards: 1h20m (lower bound 1h10m, total 2h21m)"
+    )
+    assert report[1:3] == ["  shard 0: 1 plugins, 1h01m", "  shard 1: 3 plugins, 1h20m"]
+    assert report[-2:] == [
+        "  a: 1h01m (install 1h00m, extract 1m00s)",
+        "  b: 30m00s (install 30m00s)",
+    ]
+
+
+SHARDED_PACKAGES = [
+    "snakemake-executor-plugin-azure",
+    "snakemake-storage-plugin-s3",
+    "snakemake-executor-plugin-slurm",
+]
+
+
+def _write_shard(shard_dir, index, count, plugins, durations, packages=None):
+    shard_dir.mkdir()
+    for entry in plugins:
+        entry["facets"] = {
+            "name": entry["name"],
+            "type": entry["type"],
+            "summary": "",
+            "settings": [],
+            "schemes": [],
+            "snakemake": None,
+            "updated": None,
+        }
+        page = shard_dir / "plugins" / entry["type"] / f"{entry['name']}.json"
+        page.parent.mkdir(parents=True, exist_ok=True)
+        page.write_text(entry["name"])
+    (shard_dir / "shard.json").write_text(
+        json.dumps(
+            {
+                "shard_index": index,
+                "shard_count": count,
+                "packages": SHARDED_PACKAGES if packages is None else packages,
+                "assigned": [
+                    f"snakemake-{entry['type']}-plugin-{entry['name']}"
+                    for entry in plugins
+                ],
+                "plugins": plugins,
+                "durations": durations,
+            }
+        )
+    )
+
+
+def test_merge_shards(tmp_path, monkeypatch):
+    """Test shards are merged in PyPI index order with updated costs."""
+    monkeypatch.chdir(Path(__file__).parent)
+    _write_shard(
+        tmp_path / "shard-0",
+        0,
+        2,
+        [
+            {"type": "storage", "name": "s3", "position": 1},
+            {"type": "executor", "name": "slurm", "position": 2},
+        ],
+        {"snakemake-storage-plugin-s3": {"pypi": 1.0, "install": 4.0}},
+    )
+    _write_shard(
+        tmp_path / "shard-1",
+        1,
+        2,
+        [{"type": "executor", "name": "azure", "position": 0}],
+        {"snakemake-executor-plugin-azure": {"pypi": 7.0}},
+    )
+    costs = tmp_path / "costs.json"
+    costs.write_text(
+        json.dumps(
+            {"snakemake-storage-plugin-s3": {"pypi": 3.0}, "old": {"install": 2.0}}
+        )
+    )
+    out = tmp_path / "out"
+    out.mkdir()
+
+    merge_shards([tmp_path / "shard-0", tmp_path / "shard-1"], out, costs)
+
+    assert (out / "plugins" / "executor" / "azure.json").read_text() == "azure"
+    assert (out / "plugins" / "storage" / "s3.json").exists()
+    index = (out / "index.rst").read_text()
+    assert index.index("plugins/executor/azure") < index.index("plugins/executor/slurm")
+    assert json.loads((tmp_path / "rst-validation.json").read_text()) == {"plugins": {}}
+    assert "plugins/storage/s3" in (out / "compatibility.rst").read_text()
+    assert index.index("plugins/executor/slurm") < index.index("plugins/storage/s3")
+    facet_index = json.loads((out / "_extra" / "plugin-facets.json").read_text())
+    assert [plugin[0] for plugin in facet_index["plugins"]] == [
+        "azure",
+        "s3",
+        "slurm",
+    ]
+    assert json.loads(costs.read_text()) == {
+        "old": {"install": 2.0},
+        "snakemake-executor-plugin-azure": {"pypi": 7.0},
+        "snakemake-storage-plugin-s3": {"pypi": 2.0, "install": 4.0},
+    }
+
+
+def test_merge_shards_missing_shard(tmp_path, monkeypatch):
+    """Test merging fails if a shard is missing."""
+    monkeypatch.chdir(Path(__file__).parent)
+    _write_shard(tmp_path / "shard-0", 0, 2, [], {})
+    with pytest.raises(ValueError):
+        merge_shards([tmp_path / "shard-0"], tmp_path)
+
+
+@pytest.mark.parametrize(
+    "second, packages, message",
+    [
+        # a plugin published in between shifted the partitioning
+        ([], SHARDED_PACKAGES[:2], "different plugin packages"),
+        ([{"type": "storage", "name": "s3", "position": 1}], None, "multiple"),
+        ([], None, "no shard: snakemake-executor-plugin-slurm"),
+    ],
+)
+def test_merge_shards_partitioning(tmp_path, monkeypatch, second, packages, message):
+    """Test merging fails unless each plugin is assigned to exactly one shard."""
+    monkeypatch.chdir(Path(__file__).parent)
+    _write_shard(
+        tmp_path / "shard-0",
+        0,
+        2,
+        [
+            {"type": "executor", "name": "azure", "position": 0},
+            {"type": "storage", "name": "s3", "position": 1},
+        ],
+        {},
+    )
+    _write_shard(tmp_path / "shard-1", 1, 2, second, {}, packages=packages)
+    out = tmp_path / "out"
+    out.mkdir()
+    with pytest.raises(ValueError, match=message):
+        merge_shards([tmp_path / "shard-0", tmp_path / "shard-1"], out)
+    assert not (out / "plugins").exists()
+
+
+# PyPI info parser tests
+
+
+INFO = {
+    "name": "snakemake-storage-plugin-s3",
+    "version": "1.0.0",
+    "summary": "S3 storage – with ünïcödé",
+    "description": '# Title\n\nSome text with {braces} and "quotes"',
+    "author": "Jane Doe, John Doe",
+    "author_email": None,
+    "project_urls": {"Repository": "https://github.com/snakemake/s3"},
+    "requires_dist": ["snakemake-interface-storage-plugins (>=3.0)"],
+    "license": "MIT",
+}
+
+RELEASES = {
+    "0.1": [{"filename": 'weird "{[name', "size": 12345}],
+    "1.0.0": [{"filename": "pkg.tar.gz", "comment_text": "\\"}],
+}
+
+
+def _parse_chunked(document: bytes, chunk_size: int):
+    parser = _PypiInfoParser()
+    for i in range(0, len(document), chunk_size):
+        info = parser.feed(document[i : i + chunk_size])
+        if info is not None:
+            return info
+    return parser.feed(b"", final=True)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_pypi_info_parser_info_first(chunk_size):
+    """Test the info object is decoded regardless of chunk boundaries."""
+    document = json.dumps(
+        {"info": INFO, "last_serial": 12345, "releases": RELEASES, "urls": []},
+        ensure_ascii=False,
+    ).encode()
+    assert _parse_chunked(document, chunk_size) == INFO
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+def test_pypi_info_parser_skips_preceding_values(chunk_size):
+    """Test other values before the info object are skipped."""
+    document = json.dumps(
+        {"last_serial": 12345, "releases": RELEASES, "urls": [], "info": INFO},
+        indent=2,
+    ).encode()
+    assert _parse_chunked(document, chunk_size) == INFO
+
+
+def test_pypi_info_parser_stops_early():
+    """Test parsing stops once the info object is complete."""
+    parser = _PypiInfoParser()
+    assert parser.feed(b'{"info": {"name": "x"}, "releases": {"0.1": [') == {
+        "name": "x"
+    }
+
+
+def test_pypi_info_parser_missing_info():
+    """Test a response without info object is rejected."""
+    with pytest.raises(MetadataError):
+        _parse_chunked(b'{"releases": {}}', 3)
+
+
+def test_plugin_record_from_info():
+    """Test the compact record keeps the fields used by the catalog."""
+    record = PluginRecord.from_info(INFO)
+    assert record.name == "snakemake-storage-plugin-s3"
+    assert record.authors == ["Jane Doe", "John Doe"]
+    assert record.license == "MIT"
+    assert record.requires_dist == INFO["requires_dist"]
+    assert not hasattr(record, "__dict__")
+
+
+def test_plugin_record_from_sparse_info():
+    """Test missing optional fields get empty defaults."""
+    record = PluginRecord.from_info(
+        {"name": "x", "version": "1.0", "author_email": "a@b.c", "requires_dist": None}
+    )
+    assert record.authors == ["a@b.c"]
+    assert record.description == ""
+    assert record.project_urls == {}
+    assert record.requires_dist == []
+
+
+def test_pending_plugin_context(monkeypatch):
+    """Test pending plugins are rendered from their PyPI record alone."""
+    monkeypatch.chdir(Path(__file__).parent)
+    package = "snakemake-executor-plugin-a"
+    context = ExecutorPluginCollector().pending_plugin(package, plugin_record(package))
+    assert context["timed_out"]
+    # the description is not rendered, thus neither converted nor stored twice
+    assert "desc" not in context
+    page = render_plugin(_get_templates(), {**context, "snakemake_version": None})
+    assert "has not been collected yet" in page
+
+
+# Forge API tests
+
+
+@pytest.fixture
+def forge_server():
+    """A local stand-in for the GitHub and GitLab GraphQL endpoints."""
+    requests_seen = []
+    responses = {}
+
+    class Handler(QuietHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests_seen.append(
+                (self.path, body["query"], self.headers.get("Authorization"))
+            )
+            status, response = responses[self.path]
+            payload = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    with serve_http(Handler) as url:
+        yield url, responses, requests_seen
+
+
+def test_forge_api_github_batched(forge_server, monkeypatch):
+    """Test all GitHub repositories are fetched in one request."""
+    url, responses, requests_seen = forge_server
+    responses["/graphql"] = (
+        200,
+        {
+            "data": {
+                "r0": {
+                    "defaultBranchRef": {
+                        "target": {
+                            "oid": "abcdef1234567",
+                            "committedDate": "2026-03-01T12:00:00Z",
+                        }
+                    },
+                    "intro": {"text": "Intro"},
+                    "further": {"text": "Further"},
+                },
+                "r1": {
+                    "defaultBranchRef": {
+                        "target": {
+                            "oid": "1234567abcdef",
+                            "committedDate": "2025-01-01T00:00:00Z",
+                        }
+                    },
+                    "intro": None,
+                    "further": None,
+                },
+                "r2": None,
+            },
+            "errors": [{"message": "Could not resolve to a Repository"}],
+        },
+    )
+    forge_api = ForgeApi(github_token="secret", github_api_url=url)
+    repos = [
+        "https://github.com/snakemake/a",
+        "https://github.com/snakemake/b",
+        "https://github.com/snakemake/gone",
+    ]
+    forge_api.prefetch(repos)
+
+    assert len(requests_seen) == 1
+    path, query, auth = requests_seen[0]
+    assert auth == "Bearer secret"
+    assert 'owner: "snakemake", name: "b"' in query
+
+    info = forge_api.get_plugin_git_info(repos[0])
+    assert info.commit.sha == "abcdef1"
+    assert info.commit.date == "2026-03-01T12:00:00Z"
+    assert info.docs.intro == "Intro"
+    assert info.docs.further == "Further"
+    info = forge_api.get_plugin_git_info(repos[1])
+    assert info.docs.intro is None
+
+    # repositories missing from the response are cloned instead
+    monkeypatch.setattr(
+        collect_plugins, "_get_plugin_git_info", lambda url, timeout=None: "cloned"
+    )
+    assert forge_api.get_plugin_git_info(repos[2]) == "cloned"
+
+
+def test_forge_api_github_requires_token(forge_server):
+    """Test GitHub repositories are not queried without a token."""
+    url, responses, requests_seen = forge_server
+    forge_api = ForgeApi(github_api_url=url)
+    forge_api.prefetch(["https://github.com/snakemake/a"])
+    assert requests_seen == []
+
+
+def test_forge_api_gitlab(forge_server):
+    """Test GitLab projects are fetched via their full path."""
+    url, responses, requests_seen = forge_server
+    responses["/api/graphql"] = (
+        200,
+        {
+            "data": {
+                "projects": {
+                    "nodes": [
+                        {
+                            "fullPath": "Group/Sub/Plugin",
+                            "repository": {
+                                "tree": {
+                                    "lastCommit": {
+                                        "sha": "fedcba9876543",
+                                        "committedDate": "2026-01-01T00:00:00+00:00",
+                                    }
+                                },
+                                "blobs": {
+                                    "nodes": [
+                                        {
+                                            "path": "docs/further.md",
+                                            "rawTextBlob": "More",
+                                        }
+                                    ]
+                                },
+                            },
+                        }
+                    ]
+                }
+            }
+        },
+    )
+    forge_api = ForgeApi(gitlab_url=url)
+    forge_api.prefetch(["https://gitlab.com/group/sub/plugin"])
+
+    assert len(requests_seen) == 1
+    assert '"group/sub/plugin"' in requests_seen[0][1]
+    info = forge_api.get_plugin_git_info("https://gitlab.com/group/sub/plugin")
+    assert info.commit.sha == "fedcba9"
+    assert info.docs.intro is None
+    assert info.docs.further == "More"
+
+
+def test_forge_api_failure_falls_back(forge_server, monkeypatch):
+    """Test an API failure falls back to cloning."""
+    url, responses, requests_seen = forge_server
+    responses["/api/graphql"] = (502, {})
+    forge_api = ForgeApi(gitlab_url=url)
+    forge_api.prefetch(["https://gitlab.com/group/plugin"])
+    monkeypatch.setattr(
+        collect_plugins, "_get_plugin_git_info", lambda url, timeout=None: "cloned"
+    )
+    assert forge_api.get_plugin_git_info("https://gitlab.com/group/plugin") == "cloned"
+
+
+# Refresh tests
+
+
+def test_refresh_priority():
+    """Test new plugins and releases are refreshed first, failed plugins last."""
+    stored = {
+        "refreshed": "2026-01-01T00:00:00+00:00",
+        "version": "1.0",
+        "failed": False,
+    }
+    older = {**stored, "refreshed": "2025-01-01T00:00:00+00:00"}
+    failed = {**stored, "failed": True}
+    keys = {
+        "new": _refresh_priority(plugin_record("a"), None),
+        "release": _refresh_priority(plugin_record("a", "2.0"), stored),
+        "older": _refresh_priority(plugin_record("a"), older),
+        "stored": _refresh_priority(plugin_record("a"), stored),
+        "failed": _refresh_priority(plugin_record("a"), failed),
+    }
+    assert sorted(keys, key=keys.get) == ["new", "release", "older", "stored", "failed"]
+
+
+def test_result_store(tmp_path):
+    """Test results are stored and newer results are imported."""
+    store = ResultStore(tmp_path / "a")
+    assert store.load("pkg") is None
+    store.save("pkg", plugin_context("pkg", error="broken"))
+    entry = store.load("pkg")
+    assert entry["version"] == "1.0"
+    assert entry["failed"]
+
+    other = ResultStore(tmp_path / "b")
+    other.save("pkg", plugin_context("pkg", "2.0"))
+    other.save("other", plugin_context("other"))
+    store.import_from(other)
+    assert store.load("pkg")["version"] == "2.0"
+    assert store.load("other") is not None
+
+
+# Grouped environment tests
+
+
+def test_group_plugins_by_compatible_interface():
+    """Test plugins are grouped if their interface requirements overlap."""
+    iface = "snakemake-interface-executor-plugins"
+    groups = group_plugins(
+        {
+            "a": [f"{iface}>=9.0,<10.0"],
+            "b": [f"{iface}>=8.0,<10.0"],
+            "c": [f"{iface}>=10.0"],
+            "d": [],
+            "e": [f"{iface}>=9.2", "other"],
+            "f": ["snakemake-interface-storage-plugins>=3.0"],
+        }
+    )
+    assert groups == [["a", "b", "e"], ["c"], ["d"], ["f"]]
+
+
+def test_group_plugins_max_size():
+    """Test groups are limited in size."""
+    iface = "snakemake-interface-executor-plugins>=9.0"
+    groups = group_plugins({name: [iface] for name in "abcde"}, max_size=2)
+    assert groups == [["a", "b"], ["c", "d"], ["e"]]
+
+
+class _FakeGroupCollector:
+    """
+    GroupMetadataCollector that cannot install the packages in `broken` and runs
+    out of time with those in `slow`.
+    """
+
+    broken = {"c"}
+    slow = set()
+    installs = []
+    budgets = []
+
+    def __init__(self, packages, plugin_type, budget=None):
+        self.packages = packages
+        self.budgets.append(budget)
+
+    def __enter__(self):
+        self.installs.append(list(self.packages))
+        if self.slow & set(self.packages):
+            raise DeadlineExceeded("Timed out")
+        if self.broken & set(self.packages):
+            raise MetadataError("Cannot be installed together")
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def collect(self, aux_info_statement=None):
+        return {package: ([], {}) for package in self.packages}
+
+
+def test_collect_group_metadata_splits_on_failure(monkeypatch):
+    """Test groups are split until their parts can be installed."""
+    monkeypatch.setattr(collect_plugins, "GroupMetadataCollector", _FakeGroupCollector)
+    monkeypatch.setattr(_FakeGroupCollector, "installs", [])
+    monkeypatch.setattr(_FakeGroupCollector, "budgets", [])
+
+    metadata = _collect_group_metadata(
+        ExecutorPluginCollector(), dict.fromkeys("abcd", "1.0")
+    )
+
+    assert _FakeGroupCollector.installs == [
+        ["a", "b", "c", "d"],
+        ["a", "b"],
+        ["c", "d"],
+    ]
+    # the halves do not get a budget of their own
+    budget = _FakeGroupCollector.budgets[0]
+    deadlines = collect_plugins.DEADLINES
+    assert budget.seconds == deadlines.plugin + 3 * deadlines.extract
+    assert all(other is budget for other in _FakeGroupCollector.budgets)
+    # c and d are left to be collected on their own
+    assert metadata == {"a": ([], {}), "b": ([], {})}
+
+
+def test_collect_group_metadata_timeout(monkeypatch):
+    """Test groups running out of time are collected per plugin, not split."""
+    monkeypatch.setattr(collect_plugins, "GroupMetadataCollector", _FakeGroupCollector)
+    monkeypatch.setattr(_FakeGroupCollector, "installs", [])
+    monkeypatch.setattr(_FakeGroupCollector, "slow", {"a"})
+
+    metadata = _collect_group_metadata(
+        ExecutorPluginCollector(), dict.fromkeys("abcd", "1.0")
+    )
+
+    assert _FakeGroupCollector.installs == [["a", "b", "c", "d"]]
+    assert metadata == {}
+
+
+def test_group_metadata_collector_falls_back_to_pypi(monkeypatch):
+    """Test groups that cannot be installed from conda are installed from PyPI."""
+    commands = []
+
+    def run_process(cmd, cwd=None, timeout=None, stdout=None, stderr=None, env=None):
+        commands.append(cmd)
+        if cmd[:2] == ["pixi", "add"] and "snakemake-minimal" in cmd:
+            raise subprocess.CalledProcessError(1, cmd, output=b"not on conda")
+        return subprocess.CompletedProcess(cmd, 0, stdout=b"")
+
+    monkeypatch.setattr(collect_plugins, "_run_process", run_process)
+    packages = {
+        "snakemake-executor-plugin-a": "1.0",
+        "snakemake-executor-plugin-b": "2.0",
+    }
+    with GroupMetadataCollector(packages, "executor") as collector:
+        assert collector.budget.seconds == (
+            collect_plugins.DEADLINES.plugin + collect_plugins.DEADLINES.extract
+        )
+        assert collector.envname
+
+    assert commands[-1] == [
+        "pixi",
+        "add",
+        "snakemake-executor-plugin-a==1.0",
+        "snakemake-executor-plugin-b==2.0",
+        "snakemake",
+        "--pypi",
+    ]
+
+
+def test_group_metadata_collector_extracts_all(tmp_path, monkeypatch):
+    """Test the metadata of all plugins of a group is extracted in one run."""
+    package = tmp_path / "snakemake_interface_storage_plugins"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "registry.py").write_text(
+        "from types import SimpleNamespace\n"
+        "class StoragePluginRegistry:\n"
+        "    def get_plugin(self, name):\n"
+        "        if name == 'broken':\n"
+        "            raise ValueError('no such plugin')\n"
+        "        query = SimpleNamespace(\n"
+        "            query=f'{name}://x', description='d', type=SimpleNamespace(name='ANY')\n"
+        "        )\n"
+        "        return SimpleNamespace(\n"
+        "            get_settings_info=lambda: [{'name': name, 'type': int}],\n"
+        "            storage_provider=SimpleNamespace(example_queries=lambda: [query]),\n"
+        "        )\n"
+    )
+
+    def run(self, cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=None):
+        assert cmd[:3] == ["pixi", "run", "python"]
+        return subprocess.run(
+            [sys.executable] + cmd[3:],
+            cwd=self.tempdir.name,
+            env={**os.environ, "PYTHONPATH": str(tmp_path)},
+            stdout=stdout,
+            stderr=stderr,
+            check=True,
+        )
+
+    monkeypatch.setattr(GroupMetadataCollector, "_setup", lambda self: self)
+    monkeypatch.setattr(GroupMetadataCollector, "_run", run)
+    packages = {
+        "snakemake-storage-plugin-s3": "1.0",
+        "snakemake-storage-plugin-broken": "1.0",
+    }
+    with GroupMetadataCollector(packages, "storage") as collector:
+        metadata = collector.collect(StoragePluginCollector.aux_info_statement)
+
+    assert metadata["snakemake-storage-plugin-s3"] == (
+        [{"name": "s3", "type": "int"}],
+        {"example_queries": [{"query": "s3://x", "desc": "d", "type": "any"}]},
+    )
+    error = metadata["snakemake-storage-plugin-broken"]
+    assert isinstance(error, MetadataError)
+    assert "no such plugin" in str(error)
+
+
+@pytest.fixture
+def fake_collection(monkeypatch):
+    """Run _collect without network access or plugin installation."""
+    collected = []
+    monkeypatch.setattr(collect_plugins, "_build_snakemake_compat_index", list)
+    monkeypatch.setattr(collect_plugins.ForgeApi, "from_env", lambda: None)
+    monkeypatch.setattr(
+        collect_plugins,
+        "pypi_plugin_record",
+        lambda package: plugin_record(package, "2.0"),
+    )
+
+    def collect_plugin(
+        self,
+        package,
+        record,
+        forge_api=None,
+        metadata=None,
+        stages=None,
+        budget=None,
+    ):
+        collected.append(package)
+        return plugin_context(package, record.version)
+
+    monkeypatch.setattr(PluginCollectorBase, "collect_plugin", collect_plugin)
+    monkeypatch.chdir(Path(__file__).parent)
+    return collected
+
+
+def test_collect_refreshes_by_priority(tmp_path, fake_collection):
+    """Test plugins are refreshed in order of priority."""
+    store = ResultStore(tmp_path / "state")
+    store.save(
+        "snakemake-executor-plugin-b", plugin_context("snakemake-executor-plugin-b")
+    )
+    packages = ["snakemake-executor-plugin-b", "snakemake-executor-plugin-a"]
+
+    plugins = _collect(packages, tmp_path, store=store)
+
+    assert fake_collection == packages[::-1]
+    assert plugins == {"executor": ["b", "a"]}
+    assert store.load("snakemake-executor-plugin-a")["version"] == "2.0"
+
+
+def test_collect_refresh_budget_exhausted(tmp_path, fake_collection):
+    """Test plugins are rendered from stored results once the budget is used up."""
+    store = ResultStore(tmp_path / "state")
+    store.save(
+        "snakemake-executor-plugin-b", plugin_context("snakemake-executor-plugin-b")
+    )
+    packages = ["snakemake-executor-plugin-a", "snakemake-executor-plugin-b"]
+
+    plugins = _collect(packages, tmp_path, store=store, refresh_budget=0)
+
+    assert fake_collection == []
+    assert plugins == {"executor": ["a", "b"]}
+    page = json.loads((tmp_path / "plugins" / "executor" / "b.json").read_text())
+    assert (
+        page["last_refreshed"] == store.load("snakemake-executor-plugin-b")["refreshed"]
+    )
+    rendered = render_plugin(_get_templates(), page["context"], page["last_refreshed"])
+    assert "This page shows the information collected on" in rendered
+    # a has never been collected, so its page only shows the PyPI metadata
+    page = json.loads((tmp_path / "plugins" / "executor" / "a.json").read_text())
+    assert page["context"]["record"]["version"] == "2.0"
+    assert "has not been collected yet" in page["context"]["error"]
+    assert store.load("snakemake-executor-plugin-a") is None
+
+
+def test_collect_timed_out_keeps_stored_result(tmp_path, fake_collection, monkeypatch):
+    """Test a plugin running out of time is rendered from its stored result."""
+    store = ResultStore(tmp_path / "state")
+    store.save(
+        "snakemake-executor-plugin-a", plugin_context("snakemake-executor-plugin-a")
+    )
+    stored = store.load("snakemake-executor-plugin-a")
+
+    def timed_out(self, package, record, **kwargs):
+        return {
+            **plugin_context(package, record.version, error="Timed out"),
+            "timed_out": True,
+        }
+
+    monkeypatch.setattr(PluginCollectorBase, "collect_plugin", timed_out)
+    plugins = _collect(["snakemake-executor-plugin-a"], tmp_path, store=store)
+
+    assert plugins == {"executor": ["a"]}
+    page = json.loads((tmp_path / "plugins" / "executor" / "a.json").read_text())
+    assert page["last_refreshed"] == stored["refreshed"]
+    assert page["context"]["error"] is None
+    # the stored result is not replaced
+    assert store.load("snakemake-executor-plugin-a") == stored
+
+
+def test_collect_group_budget_capped(tmp_path, fake_collection, monkeypatch):
+    """Test groups get no more time than what is left of the refresh budget."""
+    monkeypatch.setattr(
+        collect_plugins, "group_plugins", lambda plugins: [list(plugins)]
+    )
+    monkeypatch.setattr(collect_plugins, "GroupMetadataCollector", _FakeGroupCollector)
+    monkeypatch.setattr(_FakeGroupCollector, "installs", [])
+    monkeypatch.setattr(_FakeGroupCollector, "budgets", [])
+    packages = ["snakemake-executor-plugin-a", "snakemake-executor-plugin-b"]
+
+    _collect(packages, tmp_path, refresh_budget=5, grouped_envs=True)
+
+    assert _FakeGroupCollector.installs == [packages]
+    assert 0 < _FakeGroupCollector.budgets[0].seconds <= 5
+
+
+def test_collect_plugin_budget_capped(tmp_path, fake_collection, monkeypatch):
+    """Test plugins get no more time than what is left of the refresh budget."""
+    budgets = []
+    collect_plugin = PluginCollectorBase.collect_plugin
+
+    def budgeted(self, package, record, budget=None, **kwargs):
+        budgets.append(budget)
+        return collect_plugin(self, package, record, **kwargs)
+
+    monkeypatch.setattr(PluginCollectorBase, "collect_plugin", budgeted)
+    _collect(["snakemake-executor-plugin-a"], tmp_path, refresh_budget=5)
+    _collect(["snakemake-executor-plugin-a"], tmp_path)
+
+    assert 0 < budgets[0].seconds <= 5
+    # the default per-plugin budget
+    assert budgets[1] is None
+
+
+def test_render_plugin_badges(monkeypatch):
+    """Test badges are rendered inline, and from shields.io only if requested."""
+    monkeypatch.chdir(Path(__file__).parent)
+    context = plugin_context("snakemake-executor-plugin-a")
+    context.update(
+        repository="https://github.com/snakemake/a",
+        repository_type="github",
+        repo_shortname="snakemake/a",
+        commit_info={"sha": "abc1234", "date": "2000-01-01T00:00:00+00:00"},
+        commit_url="https://github.com/snakemake/a/commit/abc1234",
+        snakemake_version=">=8.1",
+        authors=["Jane Doe", "John Doe"],
+    )
+    page = render_plugin(_get_templates(), context)
+    assert "img.shields.io" not in page
+    assert page.count("<svg") == 8
+    assert "January 2000" in page
+
+    page = render_plugin(_get_templates(), context, remote_badges=True)
+    assert "<svg" not in page
+    assert "https://img.shields.io/github/last-commit/snakemake/a" in page
+
+
+def test_validate_pages_quarantines_broken_docs(monkeypatch):
+    """Test broken doc fragments are quarantined as literal blocks."""
+    monkeypatch.chdir(Path(__file__).parent)
+    valid = plugin_context("snakemake-executor-plugin-a")
+    valid.update(
+        docs_intro="Some *intro*.",
+        snakemake_compatible=[["8.0.0", None]],
+    )
+    broken = plugin_context("snakemake-executor-plugin-b")
+    broken.update(docs_intro="Some *intro*.", docs_further="Some *unclosed emphasis")
+    pages = {"a": (valid, None), "b": (broken, "2026-01-01T00:00:00+00:00")}
+
+    report = _validate_pages(pages, _get_templates())
+
+    assert list(report) == ["b"]
+    assert report["b"]["quarantined"] == ["docs_further"]
+    assert report["b"]["remaining"] == []
+    assert report["b"]["problems"][0]["level"] == "WARNING"
+    context, last_refreshed = pages["b"]
+    assert context["docs_further"] == "::\n\n    Some *unclosed emphasis"
+    assert context["docs_intro"] == "Some *intro*."
+    assert "docs_further" in context["docs_warning"]
+    assert last_refreshed == "2026-01-01T00:00:00+00:00"
+    assert pages["a"] == (valid, None)
+
+
+def test_collect_keeps_unchanged_pages(tmp_path, fake_collection):
+    """Test unchanged pages are not rewritten and stale pages are removed."""
+    packages = ["snakemake-executor-plugin-a"]
+    _collect(packages, tmp_path)
+    page = tmp_path / "plugins" / "executor" / "a.json"
+    stale = tmp_path / "plugins" / "executor" / "gone.rst"
+    stale.write_text("gone")
+    mtime = page.stat().st_mtime_ns
+    time.sleep(0.01)
+
+    _collect(packages, tmp_path)
+
+    assert page.stat().st_mtime_ns == mtime
+    assert not stale.exists()
+
+
+# Facet index tests
+
+
+def test_plugin_facets():
+    """Test facets are extracted from the render context of a plugin."""
+    context = plugin_context("snakemake-executor-plugin-a")
+    context.update(
+        plugin_type="storage",
+        snakemake_version=">=8.1",
+        commit_info={"sha": "abc1234", "date": "2000-01-01T00:00:00+00:00"},
+        settings=[
+            {"name": "endpoint_url", "env_var": "SNAKEMAKE_STORAGE_S3_ENDPOINT_URL"},
+            {"name": "retries", "env_var": None},
+        ],
+        example_queries=[
+            {"query": "s3://bucket/file.txt", "desc": "", "type": "input"},
+            {"query": "s3://bucket/dir", "desc": "", "type": "output"},
+            {"query": "relative/path.txt", "desc": "", "type": "input"},
+        ],
+    )
+    facets = _plugin_facets(context)
+    assert facets["type"] == "storage"
+    assert facets["schemes"] == ["s3://"]
+    assert facets["settings"] == [
+        "SNAKEMAKE_STORAGE_S3_ENDPOINT_URL",
+        "endpoint_url",
+        "retries",
+    ]
+    assert facets["snakemake"] == "8.1"
+    assert facets["updated"] == "more than 2 years ago"
+
+
+def test_write_facet_index(tmp_path):
+    """Test facet values map to the positions of matching plugins."""
+
+    def entry(name, plugin_type, snakemake=None, schemes=(), compatible=()):
+        return {
+            "name": name,
+            "type": plugin_type,
+            "summary": "",
+            "settings": [f"{name.upper()}_TOKEN"],
+            "schemes": list(schemes),
+            "snakemake": snakemake,
+            "updated": None,
+            "snakemake_compatible": list(compatible),
+        }
+
+    _write_facet_index(
+        [
+            entry("slurm", "executor", "8.0"),
+            entry("s3", "storage", "8.10", ["s3://"]),
+            entry("gcs", "storage", "8.2", ["gs://"]),
+            # capped below the newest release
+            entry("fs", "storage", "8.0", compatible=[["8.0", "8.10"]]),
+        ],
+        tmp_path,
+    )
+    index = json.loads((tmp_path / "_extra" / "plugin-facets.json").read_text())
+    facets = index["facets"]
+    assert index["plugins"][1] == ["s3", "storage", ""]
+    assert facets["type"] == {"executor": [0], "storage": [1, 2, 3]}
+    assert facets["scheme"] == {"s3://": [1], "gs://": [2]}
+    assert facets["setting"]["s3_token"] == [1]
+    # versions are ordered semantically, upper bounds of ranges are exclusive
+    assert list(facets["snakemake"]) == ["8.0", "8.2", "8.10"]
+    assert facets["snakemake"]["8.2"] == [0, 2, 3]
+    assert facets["snakemake"]["8.10"] == [0, 1, 2]
+
+
+# CLI tests
+
+
+def test_import_is_lazy():
+    """Test importing the module does not load the heavy dependencies."""
+    heavy = ["git", "m2r2", "pypi_simple", "requests", "jinja2", "numpy", "docutils"]
+    res = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, collect_plugins; "
+            f"print([m for m in {heavy!r} if m in sys.modules])",
+        ],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert res.stdout.strip() == "[]"
+
+
+def test_discover_given_packages(monkeypatch, capsys):
+    """Test given packages are used without fetching the PyPI index."""
+    monkeypatch.setattr(
+        "pypi_simple.PyPISimple", lambda: pytest.fail("PyPI index fetched")
+    )
+    collect_plugins.main(
+        ["discover", "--packages", "snakemake-storage-plugin-s3, other,"]
+    )
+    assert capsys.readouterr().out == "snakemake-storage-plugin-s3\n"
+
+
+def test_discover_package_file(tmp_path, monkeypatch, capsys):
+    """Test packages are read from a file as written by discover."""
+    monkeypatch.setattr(
+        "pypi_simple.PyPISimple", lambda: pytest.fail("PyPI index fetched")
+    )
+    package_file = tmp_path / "plugins.txt"
+    package_file.write_text(
+        "snakemake-storage-plugin-s3\n\nsnakemake-executor-plugin-slurm\n"
+    )
+    collect_plugins.main(["discover", "--package-file", str(package_file)])
+    assert capsys.readouterr().out == (
+        "snakemake-storage-plugin-s3\nsnakemake-executor-plugin-slurm\n"
+    )
+
+
+def test_main_render(tmp_path, monkeypatch, capsys):
+    """Test a plugin page is rendered from the data of the last collection."""
+    monkeypatch.chdir(Path(__file__).parent)
+    page = tmp_path / "plugins" / "executor" / "a.json"
+    page.parent.mkdir(parents=True)
+    page.write_text(
+        json.dumps(
+            {
+                "context": plugin_context("snakemake-executor-plugin-a"),
+                "last_refreshed": None,
+            }
+        )
+    )
+    rendered = render_page(_get_templates(), "snakemake-executor-plugin-a", tmp_path)
+    assert rendered.lstrip().startswith("Snakemake executor plugin: a\n")
+
+    with pytest.raises(SystemExit) as exc_info:
+        collect_plugins.main(["render", "snakemake-executor-plugin-b"])
+    assert exc_info.value.code == 1
+    assert "Cannot render snakemake-executor-plugin-b" in capsys.readouterr().err
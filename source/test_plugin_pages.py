@@ -0,0 +1,93 @@
+from pathlib import Path
+import shutil
+
+import pytest
+from sphinx.application import Sphinx
+
+from collect_plugins import _write_page
+from conftest import plugin_context
+
+TEMPLATES = Path(__file__).parent / "_templates"
+
+
+def _context(name, summary="A plugin"):
+    return plugin_context(
+        f"snakemake-executor-plugin-{name}",
+        summary=summary,
+        authors=["Jane Doe"],
+        license="MIT",
+    )
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    srcdir = tmp_path / "source"
+    shutil.copytree(TEMPLATES, srcdir / "_templates")
+    (srcdir / "conf.py").write_text(
+        'extensions = ["plugin_pages"]\ntemplates_path = ["_templates"]\n'
+    )
+    (srcdir / "index.rst").write_text(
+        "Catalog\n=======\n\n.. toctree::\n   :glob:\n\n   plugins/*/*\n"
+    )
+    for name in ("a", "b"):
+        _write_page(srcdir, _context(name))
+    return srcdir
+
+
+def _build(srcdir, parallel=0):
+    """Build the catalog and return the docnames that have been read."""
+    app = Sphinx(
+        srcdir,
+        srcdir,
+        srcdir.parent / "build",
+        srcdir.parent / "doctrees",
+        "html",
+        status=None,
+        freshenv=False,
+        parallel=parallel,
+    )
+    read = []
+    app.connect(
+        "env-before-read-docs", lambda app, env, docnames: read.extend(docnames)
+    )
+    app.build()
+    assert app.statuscode == 0
+    return sorted(read)
+
+
+def test_plugin_pages_rendered(catalog):
+    """Test plugin pages are rendered from their data."""
+    assert _build(catalog) == ["index", "plugins/executor/a", "plugins/executor/b"]
+    html = (catalog.parent / "build" / "plugins" / "executor" / "a.html").read_text()
+    assert "snakemake-executor-plugin-a" in html
+
+
+def test_plugin_pages_outdated(catalog):
+    """Test only pages with changed data are read again."""
+    _build(catalog)
+    assert _build(catalog) == []
+
+    _write_page(catalog, _context("b", summary="Another summary"))
+    assert _build(catalog) == ["plugins/executor/b"]
+
+
+def test_plugin_pages_rendering_changed(catalog):
+    """Test pages are read again if their rendering changed."""
+    _build(catalog)
+    template = catalog / "_templates" / "plugin_base.rst.j2"
+    template.write_text(template.read_text() + "\nchanged\n")
+    assert _build(catalog) == ["plugins/executor/a", "plugins/executor/b"]
+
+
+def test_plugin_pages_parallel(catalog):
+    """Test plugin pages can be read in parallel."""
+    # Sphinx only reads in parallel beyond a few documents
+    names = [f"p{i}" for i in range(10)]
+    for name in names:
+        _write_page(catalog, _context(name))
+    assert len(_build(catalog, parallel=2)) == 13
+    # the page digests of the parallel readers have been merged
+    assert _build(catalog, parallel=2) == []
+
+    _write_page(catalog, _context("p3", summary="Another summary"))
+    assert _build(catalog, parallel=2) == ["plugins/executor/p3"]
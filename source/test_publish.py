@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import publish
+from publish import MANIFEST, fingerprint_assets
+
+
+def _site(root, logo="<svg>logo</svg>"):
+    (root / "_static").mkdir(parents=True)
+    (root / "plugins").mkdir()
+    (root / "_static" / "logo.svg").write_text(logo)
+    (root / "_static" / "custom.css").write_text(
+        ".logo { background: url(logo.svg); }\n" + "p { margin: 0; }\n" * 100
+    )
+    body = "<p>text</p>" * 100
+    (root / "index.html").write_text(
+        '<link rel="stylesheet" href="_static/custom.css?v=1">'
+        '<img src="_static/logo.svg"><a href="https://example.org/_static/x.css">'
+        f"{body}"
+    )
+    (root / "plugins" / "a.html").write_text(
+        '<link rel="stylesheet" href="../_static/custom.css?v=1">'
+    )
+
+
+def test_fingerprint_assets_follows_references(tmp_path):
+    """Test stylesheets are renamed along with the assets they refer to."""
+    _site(tmp_path / "a")
+    _site(tmp_path / "b", logo="<svg>other logo</svg>")
+
+    names_a = fingerprint_assets(tmp_path / "a")
+    names_b = fingerprint_assets(tmp_path / "b")
+
+    assert names_a["_static/logo.svg"] != names_b["_static/logo.svg"]
+    assert names_a["_static/custom.css"] != names_b["_static/custom.css"]
+    css = (tmp_path / "a" / names_a["_static/custom.css"]).read_text()
+    logo = names_a["_static/logo.svg"].removeprefix("_static/")
+    assert f"url({logo})" in css
+    # originals are kept
+    assert (tmp_path / "a" / "_static" / "logo.svg").exists()
+
+
+def test_publish(tmp_path):
+    """Test pages refer to fingerprinted assets and are precompressed."""
+    _site(tmp_path / "build")
+    # composed by a script, hence not rewritten
+    (tmp_path / "build" / "_static" / "icon.png").write_bytes(b"png")
+    (tmp_path / "build" / "_static" / "theme.js").write_text(
+        "img.src = root + 'icon.png';"
+    )
+    output = tmp_path / "public"
+    output.mkdir()
+    (output / "stale.html").write_text("")
+
+    names = publish.publish(tmp_path / "build", output, workers=2)
+
+    assert json.loads((output / MANIFEST).read_text()) == names
+    assert not (output / "stale.html").exists()
+    css = names["_static/custom.css"]
+    index = (output / "index.html").read_text()
+    assert f'href="{css}?v=1"' in index
+    assert f'src="{names["_static/logo.svg"]}"' in index
+    assert 'href="https://example.org/_static/x.css"' in index
+    assert f'href="../{css}?v=1"' in (output / "plugins" / "a.html").read_text()
+    # the build itself is left as is
+    assert (
+        'href="_static/custom.css?v=1"'
+        in (tmp_path / "build" / "index.html").read_text()
+    )
+
+    # originals are only kept if still referred to
+    assert not (output / "_static" / "logo.svg").exists()
+    assert not (output / "_static" / "custom.css").exists()
+    assert (output / "_static" / "icon.png").exists()
+
+    assert gzip.decompress((output / "index.html.gz").read_bytes()).decode() == index
+    assert (output / f"{css}.gz").exists()
+    assert not (output / "_static" / "custom.css.gz").exists()
+    # too small to benefit from compression
+    assert not (output / "plugins" / "a.html.gz").exists()
+
+
+def test_publish_without_compression(tmp_path):
+    """Test no compressed variants are written for hosts that do not serve them."""
+    _site(tmp_path / "build")
+    output = tmp_path / "public"
+
+    publish.main([str(tmp_path / "build"), str(output), "--no-compress"])
+
+    assert (output / "index.html").exists()
+    assert not list(output.rglob("*.gz"))
+    assert not list(output.rglob("*.br"))
@@ -0,0 +1,21 @@
+from validate_rst import check_rst
+
+
+def test_check_rst_valid():
+    """Test valid reStructuredText yields no problems."""
+    assert (
+        check_rst(
+            "Title\n=====\n\nSome *text*.\n\n.. code-block:: python\n\n   x = 1\n"
+        )
+        == []
+    )
+
+
+def test_check_rst_problems():
+    """Test warnings and errors are reported with their line."""
+    problems = check_rst("Title\n=====\n\nSome *text\n\n.. unknown-directive::\n")
+    assert [(problem["line"], problem["level"]) for problem in problems] == [
+        (4, "WARNING"),
+        (6, "ERROR"),
+    ]
+    assert "emphasis" in problems[0]["message"]
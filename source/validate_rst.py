@@ -0,0 +1,127 @@
+"""
+Validation of rendered plugin pages with plain docutils, such that broken
+reStructuredText is caught right after collection instead of deep inside
+sphinx-build (see collect_plugins._validate_pages).
+
+Directives and roles that only Sphinx provides are accepted without checking
+their content. They are registered globally in docutils, hence this module is
+meant to be used in worker processes only (see init_worker), never in the
+process running sphinx-build.
+"""
+
+from typing import Any, Dict, List
+
+from docutils import nodes, utils
+from docutils.frontend import get_default_settings
+from docutils.parsers.rst import Directive, Parser, directives, roles
+
+# docutils levels of WARNING and above, which sphinx-build reports
+MIN_LEVEL = 2
+
+_SPHINX_DIRECTIVES = (
+    "literalinclude",
+    "highlight",
+    "toctree",
+    "versionadded",
+    "versionchanged",
+    "deprecated",
+    "seealso",
+    "only",
+    "glossary",
+    "hlist",
+    "centered",
+    "index",
+    "tabularcolumns",
+    "productionlist",
+)
+
+_SPHINX_ROLES = (
+    "doc",
+    "ref",
+    "numref",
+    "any",
+    "term",
+    "download",
+    "envvar",
+    "option",
+    "keyword",
+    "abbr",
+    "command",
+    "dfn",
+    "file",
+    "guilabel",
+    "kbd",
+    "mailheader",
+    "makevar",
+    "manpage",
+    "menuselection",
+    "mimetype",
+    "newsgroup",
+    "program",
+    "regexp",
+    "samp",
+    "class",
+    "func",
+    "meth",
+    "mod",
+    "attr",
+    "exc",
+    "data",
+    "obj",
+    "const",
+)
+
+
+class _AnyOptions(dict):
+    def __missing__(self, key):
+        return directives.unchanged
+
+
+class _SphinxDirective(Directive):
+    optional_arguments = 1
+    final_argument_whitespace = True
+    has_content = True
+    option_spec = _AnyOptions()
+
+    def run(self):
+        return []
+
+
+def _sphinx_role(name, rawtext, text, lineno, inliner, options=None, content=None):
+    return [nodes.literal(rawtext, text)], []
+
+
+def init_worker() -> None:
+    """Make docutils accept the Sphinx directives and roles."""
+    for name in _SPHINX_DIRECTIVES:
+        directives.register_directive(name, _SphinxDirective)
+    for name in _SPHINX_ROLES:
+        roles.register_local_role(name, _sphinx_role)
+        roles.register_local_role(f"py:{name}", _sphinx_role)
+
+
+def check_rst(text: str) -> List[Dict[str, Any]]:
+    """Parse `text` and return the problems (warnings and errors) found."""
+    settings = get_default_settings(Parser)
+    # collect messages via the observer below instead of printing them
+    settings.report_level = 5
+    settings.halt_level = 5
+    settings.file_insertion_enabled = False
+    document = utils.new_document("<page>", settings)
+    problems = []
+
+    def observe(message):
+        if message["level"] >= MIN_LEVEL:
+            problems.append(
+                {
+                    "line": message.get("line"),
+                    "level": message["type"],
+                    "message": message.children[0].astext()
+                    if message.children
+                    else message.astext(),
+                }
+            )
+
+    document.reporter.attach_observer(observe)
+    Parser().parse(text, document)
+    return problems